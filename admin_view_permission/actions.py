@@ -0,0 +1,123 @@
+from __future__ import unicode_literals
+
+import csv
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import six
+from django.utils.encoding import force_text
+from django.utils.translation import ugettext_lazy as _
+
+from .enums import DjangoVersion
+from .utils import DJANGO_VERSION
+
+DEFAULT_EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo(object):
+    """
+    A file like object which returns the written value instead of storing it,
+    so the csv writer produces the rows one by one
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_export_chunk_size():
+    return getattr(settings, 'ADMIN_VIEW_PERMISSION_EXPORT_CHUNK_SIZE',
+                   DEFAULT_EXPORT_CHUNK_SIZE)
+
+
+def get_export_rows(modeladmin, request, queryset):
+    """
+    Return the exported fields and an iterator over the values of these
+    fields. The rows are fetched in chunks, so the memory use doesn't grow
+    with the size of the queryset
+    """
+    fields = modeladmin.get_view_only_export_fields(request)
+    queryset = queryset.prefetch_related(None).values_list(
+        *[field.name for field in fields])
+    if DJANGO_VERSION >= DjangoVersion.DJANGO_20:
+        rows = queryset.iterator(chunk_size=get_export_chunk_size())
+    else:
+        rows = queryset.iterator()
+
+    return fields, rows
+
+
+def _encode_csv_row(row):
+    row = ['' if value is None else force_text(value) for value in row]
+    if six.PY2:
+        # The csv module of python 2 doesn't support unicode
+        row = [value.encode('utf-8') for value in row]
+    return row
+
+
+def get_csv_lines(fields, rows, header=True):
+    """
+    Return an iterator over the CSV lines of the given rows
+    """
+    writer = csv.writer(Echo())
+    if header:
+        yield writer.writerow(_encode_csv_row(
+            [field.name for field in fields]))
+    for row in rows:
+        yield writer.writerow(_encode_csv_row(row))
+
+
+def get_jsonl_lines(fields, rows, header=True):
+    """
+    Return an iterator over the JSON Lines of the given rows. JSON Lines have
+    no header
+    """
+    names = [field.name for field in fields]
+    for row in rows:
+        yield json.dumps(OrderedDict(zip(names, row)),
+                         cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = OrderedDict([
+    ('csv', (get_csv_lines, 'text/csv')),
+    ('jsonl', (get_jsonl_lines, 'application/x-ndjson')),
+])
+
+
+def export(modeladmin, request, queryset, export_format):
+    """
+    Stream the objects of the queryset in the given format
+    """
+    get_lines, content_type = EXPORT_FORMATS[export_format]
+    fields, rows = get_export_rows(modeladmin, request, queryset)
+    response = StreamingHttpResponse(
+        get_lines(fields, rows), content_type=content_type)
+    response['Content-Disposition'] = 'attachment; filename="%s.%s"' % (
+        modeladmin.model._meta.model_name, export_format)
+    return response
+
+
+def export_as_csv(modeladmin, request, queryset):
+    """
+    Stream the selected objects as a CSV file with a header row
+    """
+    return export(modeladmin, request, queryset, 'csv')
+
+
+export_as_csv.short_description = _(
+    'Export selected %(verbose_name_plural)s as CSV')
+export_as_csv.allowed_permissions = ('view',)
+
+
+def export_as_jsonl(modeladmin, request, queryset):
+    """
+    Stream the selected objects as a JSON Lines file, one object per line
+    """
+    return export(modeladmin, request, queryset, 'jsonl')
+
+
+export_as_jsonl.short_description = _(
+    'Export selected %(verbose_name_plural)s as JSON Lines')
+export_as_jsonl.allowed_permissions = ('view',)
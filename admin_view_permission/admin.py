@@ -1,30 +1,94 @@
 from __future__ import unicode_literals
 
+import base64
+import calendar
+import datetime
+import hashlib
+import json
+import operator
 from collections import OrderedDict
+from functools import reduce, update_wrapper
 
 from django.apps import apps
 from django.conf import settings
 from django.contrib import admin
-from django.contrib.admin.options import TO_FIELD_VAR
+from django.contrib.admin import helpers
+from django.contrib.admin.options import (
+    IS_POPUP_VAR,
+    TO_FIELD_VAR,
+    IncorrectLookupParameters,
+    csrf_protect_m,
+)
 from django.contrib.admin.templatetags.admin_modify import register
 from django.contrib.admin.templatetags.admin_modify import \
     submit_row as original_submit_row
-from django.contrib.admin.utils import flatten, unquote
-from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.utils import flatten, flatten_fieldsets, unquote
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
 from django.contrib.auth import get_permission_codename
-from django.core.exceptions import PermissionDenied
-from django.utils.encoding import force_text
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    PermissionDenied,
+    ValidationError,
+)
+from django.db import models
+from django.forms.models import BaseInlineFormSet, _get_foreign_key
+from django.template.response import TemplateResponse
+from django.utils import six, timezone
+from django.utils.encoding import force_bytes, force_text
+from django.utils.http import http_date, quote_etag
 from django.utils.module_loading import import_string
 from django.utils.text import capfirst
+from django.utils.translation import get_language
 from django.utils.translation import ugettext as _
 
-from .utils import get_model_name
+from .cache import (
+    CACHE_KEY_PREFIX,
+    get_cache,
+    get_cache_generation,
+    get_permission_cache,
+    get_permission_fingerprint,
+)
+from .enums import ChangeListPagination, DjangoVersion
+from .helpers import (
+    VIEW_ONLY_INLINE_TEMPLATES,
+    ViewOnlyForm,
+    ViewOnlyInlineAdminFormSet,
+    ViewOnlyInlineFormSet,
+)
+from .permissions import (
+    can_use_permission_index,
+    get_function,
+    has_indexed_permission,
+    is_admin_permission_method,
+)
+from .utils import DJANGO_VERSION, get_model_name
 
 try:
-    from django.urls import NoReverseMatch, reverse
+    from django.urls import (
+        NoReverseMatch,
+        get_script_prefix,
+        get_urlconf,
+        reverse,
+    )
 except ImportError:
     # django < 2.0
-    from django.core.urlresolvers import NoReverseMatch, reverse
+    from django.core.urlresolvers import (
+        NoReverseMatch,
+        get_script_prefix,
+        get_urlconf,
+        reverse,
+    )
+
+try:
+    from django.utils.cache import get_conditional_response
+except ImportError:
+    # django < 1.9
+    get_conditional_response = None
+
+CHANGE_VIEW_OBJECT_ATTR = '_admin_view_permission_object'
+VIEW_ONLY_REQUEST_ATTR = '_admin_view_permission_view_only'
+REVALIDATE_RESPONSE_ATTR = '_admin_view_permission_revalidate'
+CURSOR_VAR = 'cursor'
 
 
 @register.inclusion_tag('admin/submit_line.html', takes_context=True)
@@ -46,25 +110,282 @@ def submit_row(context):
 
 class AdminViewPermissionChangeList(ChangeList):
     def __init__(self, request, *args, **kwargs):
+        self.request = request
+        self.pagination = ChangeListPagination.OFFSET
+        self.cursor = None
+        self.previous_url = None
+        self.next_url = None
+        self.show_page_num = False
         super(AdminViewPermissionChangeList, self).__init__(
             request, *args, **kwargs)
-        self.request = request
 
         # If user has only view permission change the title of the changelist
-        # view
+        # view and disable the list_editable, so the changelist formset is
+        # never built
         if self.model_admin.has_view_permission(self.request) and \
                 not self.model_admin._has_change_only_permission(self.request):
+            self.list_editable = ()
             if self.is_popup:
                 title = _('Select %s')
             else:
                 title = _('Select %s to view')
             self.title = title % force_text(self.opts.verbose_name)
 
+    def get_pagination(self, request):
+        """
+        Return the pagination mode of the changelist. The view_only_pagination
+        of the model admin applies only to the users with view only permission
+        """
+        pagination = getattr(self.model_admin, 'view_only_pagination',
+                             ChangeListPagination.OFFSET)
+        if pagination != ChangeListPagination.OFFSET and \
+                self.model_admin.has_view_permission(request) and \
+                not self.model_admin._has_change_only_permission(request):
+            return pagination
+
+        return ChangeListPagination.OFFSET
+
+    def get_results(self, request):
+        self.pagination = self.get_pagination(request)
+        if self.pagination == ChangeListPagination.KEYSET:
+            # The links of the changelist (filters, ordering, search) always
+            # lead to the first page
+            self.cursor = self.params.pop(CURSOR_VAR, None)
+            keyset = self.get_keyset_ordering(request)
+            if keyset is not None:
+                return self.get_keyset_results(request, keyset)
+
+            self.pagination = ChangeListPagination.COUNTLESS
+
+        if self.pagination == ChangeListPagination.COUNTLESS:
+            self.get_countless_results(request)
+        else:
+            super(AdminViewPermissionChangeList, self).get_results(request)
+
+    def get_countless_results(self, request):
+        """
+        Fetch the objects of the current page without counting them. Fetching
+        one more object than the page size tells if there is a following page,
+        so the pages are linked with previous and next links only
+        """
+        offset = self.page_num * self.list_per_page
+        result_list = list(
+            self.queryset[offset:offset + self.list_per_page + 1])
+        if not result_list and self.page_num > 0:
+            raise IncorrectLookupParameters
+
+        has_next = len(result_list) > self.list_per_page
+        result_list = result_list[:self.list_per_page]
+        self._set_page(request, result_list, has_next or self.page_num > 0)
+        self.show_page_num = True
+
+        if self.page_num > 0:
+            self.previous_url = self.get_query_string(
+                {PAGE_VAR: self.page_num - 1})
+        if has_next:
+            self.next_url = self.get_query_string(
+                {PAGE_VAR: self.page_num + 1})
+
+    def get_keyset_results(self, request, keyset):
+        """
+        Fetch the objects which follow (or precede) the cursor in the ordering
+        of the changelist. The cursor holds the values of the ordering fields
+        of the last (or first) object of the previous page, so every page
+        costs the same whatever its position
+        """
+        after = True
+        values = None
+        if self.cursor:
+            after, values = self.decode_cursor(keyset, self.cursor)
+
+        ordering = [
+            '-' + field.name if descending == after else field.name
+            for field, descending in keyset
+        ]
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(keyset, values, after))
+
+        result_list = list(queryset[:self.list_per_page + 1])
+        has_more = len(result_list) > self.list_per_page
+        result_list = result_list[:self.list_per_page]
+        if after:
+            has_previous, has_next = values is not None, has_more
+        else:
+            has_previous, has_next = has_more, True
+            result_list.reverse()
+
+        self._set_page(request, result_list, has_previous or has_next)
+        if result_list:
+            if has_previous:
+                self.previous_url = self.get_query_string({
+                    CURSOR_VAR: self.encode_cursor(
+                        keyset, result_list[0], after=False),
+                })
+            if has_next:
+                self.next_url = self.get_query_string({
+                    CURSOR_VAR: self.encode_cursor(keyset, result_list[-1]),
+                })
+
+    def _set_page(self, request, result_list, multi_page):
+        # The totals are unknown, so only the objects of the page are counted
+        # and the "select across" of the actions is never offered
+        self.result_count = len(result_list)
+        self.full_result_count = self.result_count
+        self.show_full_result_count = False
+        self.show_admin_actions = bool(result_list)
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = multi_page
+        # The paginator counts the objects lazily, it is kept for the code
+        # which expects it on the changelist
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page)
+
+    def get_keyset_ordering(self, request):
+        """
+        Return the fields of the ordering of the changelist up to the primary
+        key with their direction, or None if the ordering doesn't allow the
+        keyset pagination: it orders by an expression, a related field or a
+        nullable field
+        """
+        keyset = []
+        names = set()
+        for order in self.get_ordering(request, self.queryset):
+            if not isinstance(order, six.string_types):
+                return None
+
+            descending = order.startswith('-')
+            name = order.lstrip('-')
+            try:
+                field = (self.lookup_opts.pk if name == 'pk' else
+                         self.lookup_opts.get_field(name))
+            except FieldDoesNotExist:
+                return None
+
+            if not field.concrete or field.null or (
+                    field.is_relation and not field.primary_key):
+                return None
+
+            if field.name in names:
+                continue
+            names.add(field.name)
+            keyset.append((field, descending))
+            # The primary key is unique, the following fields never matter
+            if field.primary_key:
+                return keyset
+
+        return None
+
+    def get_keyset_filter(self, keyset, values, after=True):
+        """
+        Return the filter of the objects which follow (or precede) the given
+        values in the ordering of the keyset
+        """
+        clauses = []
+        equal = {}
+        for (field, descending), value in zip(keyset, values):
+            lookup = 'lt' if descending == after else 'gt'
+            clause = dict(equal)
+            clause['%s__%s' % (field.name, lookup)] = value
+            clauses.append(models.Q(**clause))
+            equal[field.name] = value
+
+        return reduce(operator.or_, clauses)
+
+    def encode_cursor(self, keyset, obj, after=True):
+        """
+        Return the cursor of the page which follows (or precedes) the object
+        """
+        data = {
+            'after' if after else 'before': [
+                field.value_to_string(obj) for field, descending in keyset
+            ],
+        }
+        return force_text(base64.urlsafe_b64encode(
+            force_bytes(json.dumps(data))))
+
+    def decode_cursor(self, keyset, cursor):
+        """
+        Return the direction and the values of the given cursor. An invalid
+        cursor raises IncorrectLookupParameters
+        """
+        try:
+            data = json.loads(force_text(
+                base64.urlsafe_b64decode(force_bytes(cursor))))
+            (direction, values), = data.items()
+            if direction not in ('after', 'before') or \
+                    len(values) != len(keyset):
+                raise ValueError(cursor)
+
+            values = [
+                field.to_python(value)
+                for (field, descending), value in zip(keyset, values)
+            ]
+        except (AttributeError, TypeError, ValueError, ValidationError):
+            raise IncorrectLookupParameters
+
+        return direction == 'after', values
+
+    def get_filters_params(self, params=None):
+        lookup_params = super(AdminViewPermissionChangeList,
+                              self).get_filters_params(params)
+        # The cursor parameter is reserved by the keyset pagination only, it
+        # remains a lookup on a "cursor" field otherwise
+        if self.get_pagination(self.request) == \
+                ChangeListPagination.KEYSET:
+            lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
 
 class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
+    def _get_cached_permission(self, request, action, obj, func):
+        """
+        Return the permission decision for the given action from the request
+        permission cache, calling ``func`` only the first time
+        """
+        key = (self.__class__, self.model, action,
+               None if obj is None else (obj.pk,))
+        return get_permission_cache(request).get_or_set(key, func)
+
+    def _get_indexed_permission(self, request, action, method, *args):
+        """
+        Resolve the permission with a bit test on the permission index of the
+        user when ``method`` is the permission method of the django admin.
+        Otherwise, or when the index can't answer, call the ``method``
+        """
+        if not self.opts.auto_created and \
+                is_admin_permission_method(method, action):
+            allowed = has_indexed_permission(request, self.model, action)
+            if allowed is not None:
+                return allowed
+
+        return method(request, *args)
+
     def _has_change_only_permission(self, request, obj=None):
-        return super(AdminViewPermissionBaseModelAdmin,
-                     self).has_change_permission(request, obj)
+        return self._get_cached_permission(
+            request, 'change', obj,
+            lambda: self._get_indexed_permission(
+                request, 'change',
+                super(AdminViewPermissionBaseModelAdmin,
+                      self).has_change_permission, obj))
+
+    def has_add_permission(self, request):
+        return self._get_cached_permission(
+            request, 'add', None,
+            lambda: self._get_indexed_permission(
+                request, 'add',
+                super(AdminViewPermissionBaseModelAdmin,
+                      self).has_add_permission))
+
+    def has_delete_permission(self, request, obj=None):
+        return self._get_cached_permission(
+            request, 'delete', obj,
+            lambda: self._get_indexed_permission(
+                request, 'delete',
+                super(AdminViewPermissionBaseModelAdmin,
+                      self).has_delete_permission, obj))
 
     def get_model_perms(self, request):
         """
@@ -79,14 +400,61 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
             'view': self.has_view_permission(request)
         }
 
+    def _has_default_permissions(self):
+        """
+        Return True if none of the permission methods is overridden, so the
+        model perms depend on the permissions of the user only
+        """
+        for name in ('get_model_perms', 'has_add_permission',
+                     'has_change_permission', 'has_delete_permission',
+                     'has_view_permission', '_has_change_only_permission'):
+            if get_function(getattr(self, name)) is not get_function(
+                    getattr(AdminViewPermissionBaseModelAdmin, name)):
+                return False
+
+        parent = super(AdminViewPermissionBaseModelAdmin, self)
+        return all(
+            is_admin_permission_method(
+                getattr(parent, 'has_%s_permission' % action), action)
+            for action in ('add', 'change', 'delete'))
+
+    def _get_indexed_model_perms(self, request):
+        """
+        Return the model perms resolved from the permission index in one
+        pass, or None if the permission methods are overridden or the index
+        can't answer
+        """
+        if not self._has_default_permissions():
+            return None
+
+        perms = {}
+        for action in ('add', 'change', 'delete', 'view'):
+            perms[action] = has_indexed_permission(
+                request, self.model, action)
+            if perms[action] is None:
+                return None
+
+        # See has_change_permission
+        perms['change'] = perms['change'] or perms['view']
+        return perms
+
     def has_view_permission(self, request, obj=None):
         """
         Returns True if the given request has permission to view an object.
         Can be overridden by the user in subclasses.
         """
+        return self._get_cached_permission(
+            request, 'view', obj,
+            lambda: self._has_view_permission(request))
+
+    def _has_view_permission(self, request):
+        allowed = has_indexed_permission(request, self.model, 'view')
+        if allowed is not None:
+            return allowed
+
         opts = self.opts
-        codename = get_permission_codename('view', opts)
-        return request.user.has_perm("%s.%s" % (opts.app_label, codename))
+        return request.user.has_perm("%s.%s" % (
+            opts.app_label, get_permission_codename('view', opts)))
 
     def has_change_permission(self, request, obj=None):
         """
@@ -95,8 +463,7 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
         changelist_view views. Also, added an extra argument to determine
         whenever this function will return the original response
         """
-        change_permission = super(AdminViewPermissionBaseModelAdmin,
-                                  self).has_change_permission(request, obj)
+        change_permission = self._has_change_only_permission(request, obj)
         if change_permission or self.has_view_permission(request, obj):
             return True
 
@@ -121,6 +488,143 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
 
         return exclude
 
+    def _get_view_layouts(self):
+        """
+        Return the cache of the compiled view only field layouts. The cache
+        lives as long as the admin instance, so it is invalidated whenever the
+        admin is registered again. The inline classes created by
+        get_inline_instances carry their own cache, which is shared between
+        the inline instances of every request
+        """
+        try:
+            return self._view_layouts
+        except AttributeError:
+            self._view_layouts = {}
+            return self._view_layouts
+
+    def _compile_view_layout(self, key, func):
+        layouts = self._get_view_layouts()
+        try:
+            return layouts[key]
+        except KeyError:
+            layout = layouts[key] = func()
+            return layout
+
+    def _compile_readonly_fields(self, readonly_fields):
+        if self.fields:
+            # Set as readonly fields the specified fields
+            readonly_fields = flatten(self.fields)
+        else:
+            readonly_fields = (
+                list(readonly_fields) +
+                [field.name for field in self.opts.fields
+                 if field.editable] +
+                [field.name for field in self.opts.many_to_many
+                 if field.editable]
+            )
+
+            # Remove the id if user has not specified fields and readonly
+            # fields and the password for the User model
+            ignored_fields = {'id'}
+            if get_model_name(self.model) == settings.AUTH_USER_MODEL:
+                ignored_fields.add('password')
+
+            # remove duplicates whilst preserving order
+            readonly_fields = [
+                f for f in OrderedDict.fromkeys(readonly_fields)
+                if f not in ignored_fields
+            ]
+
+        # Remove from the readonly_fields list the excluded fields
+        # specified on the form or the modeladmin
+        excluded_fields = set(self.get_excluded_fields())
+        readonly_fields = [
+            f for f in readonly_fields if f not in excluded_fields
+        ]
+
+        # django-parler compatibility: if this model is translatable,
+        # ensure its fields are set to readonly too.
+        if hasattr(self.model, '_parler_meta'):
+            readonly_fields += list(
+                self.model._parler_meta._fields_to_model.keys()
+            )
+
+        return tuple(readonly_fields)
+
+    def _compile_relations(self, readonly_fields):
+        """
+        Return the select_related and the prefetch_related lookups of the
+        relation fields among the readonly fields
+        """
+        select_related = []
+        prefetch_related = []
+        for field_name in readonly_fields:
+            try:
+                field = self.opts.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+
+            if isinstance(field, models.ForeignKey):
+                select_related.append(field.name)
+            elif isinstance(field, models.ManyToManyField):
+                prefetch_related.append(field.name)
+
+        return tuple(select_related), tuple(prefetch_related)
+
+    def get_view_only_relations(self, request, obj=None):
+        """
+        Return the select_related and the prefetch_related lookups of the
+        readonly relation fields, so the view only pages don't resolve every
+        relation with a separate query
+        """
+        readonly_fields = tuple(self.get_readonly_fields(request, obj))
+        return self._compile_view_layout(
+            ('relations', readonly_fields),
+            lambda: self._compile_relations(readonly_fields))
+
+    def _compile_export_fields(self, field_names):
+        fields = [self.opts.pk]
+        for field_name in field_names:
+            try:
+                field = self.opts.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+
+            if field.concrete and not field.many_to_many and \
+                    field not in fields:
+                fields.append(field)
+
+        return tuple(fields)
+
+    def get_view_only_export_fields(self, request):
+        """
+        Return the model fields which the export actions write: the primary
+        key and the concrete fields shown on the change view of the user,
+        from get_fieldsets and, for the view only users, get_readonly_fields.
+        The foreign keys are exported as the primary key of the related
+        object, the many to many fields and the callables are left out
+        """
+        field_names = flatten_fieldsets(self.get_fieldsets(request))
+        if not self._has_change_only_permission(request):
+            readonly_fields = set(self.get_readonly_fields(request))
+            field_names = [f for f in field_names if f in readonly_fields]
+
+        field_names = tuple(field_names)
+        return self._compile_view_layout(
+            ('export_fields', field_names),
+            lambda: self._compile_export_fields(field_names))
+
+    def _compile_fields(self, readonly_fields):
+        excluded_fields = set(self.get_excluded_fields())
+        if self.fields:
+            readonly_fields = set(readonly_fields)
+            return [f for f in flatten(self.fields) if
+                    f in readonly_fields and f not in excluded_fields]
+
+        # Without the fields attr all the visible fields are readonly, there
+        # is no need to build the form in order to find the fields
+        return [f for f in readonly_fields if f not in excluded_fields]
+
     def get_fields(self, request, obj=None):
         """
         If the user has only the view permission return these readonly fields
@@ -129,16 +633,10 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
         if ((self.has_view_permission(request, obj) and (
             obj and not self._has_change_only_permission(request, obj))) or (
                 obj is None and not self.has_add_permission(request))):
-            fields = super(
-                AdminViewPermissionBaseModelAdmin,
-                self).get_fields(request, obj)
-            excluded_fields = self.get_excluded_fields()
-            readonly_fields = self.get_readonly_fields(request, obj)
-            new_fields = [i for i in flatten(fields) if
-                          i in readonly_fields and
-                          i not in excluded_fields]
-
-            return new_fields
+            readonly_fields = tuple(self.get_readonly_fields(request, obj))
+            return list(self._compile_view_layout(
+                ('fields', readonly_fields),
+                lambda: self._compile_fields(readonly_fields)))
         else:
             return super(AdminViewPermissionBaseModelAdmin, self).get_fields(
                 request, obj)
@@ -155,49 +653,10 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
         if ((self.has_view_permission(request, obj) and (
             obj and not self._has_change_only_permission(request, obj))) or (
                 obj is None and not self.has_add_permission(request))):
-            if self.fields:
-                # Set as readonly fields the specified fields
-                readonly_fields = flatten(self.fields)
-            else:
-                readonly_fields = (
-                    list(readonly_fields) +
-                    [field.name for field in self.opts.fields
-                     if field.editable] +
-                    [field.name for field in self.opts.many_to_many
-                     if field.editable]
-                )
-
-                # remove duplicates whilst preserving order
-                readonly_fields = list(OrderedDict.fromkeys(readonly_fields))
-
-                # Try to remove id if user has not specified fields and
-                # readonly fields
-                try:
-                    readonly_fields.remove('id')
-                except ValueError:
-                    pass
-
-                # Special case for User model
-                if get_model_name(self.model) == settings.AUTH_USER_MODEL:
-                    try:
-                        readonly_fields.remove('password')
-                    except ValueError:
-                        pass
-
-            # Remove from the readonly_fields list the excluded fields
-            # specified on the form or the modeladmin
-            excluded_fields = self.get_excluded_fields()
-            if excluded_fields:
-                readonly_fields = [
-                    f for f in readonly_fields if f not in excluded_fields
-                ]
-
-            # django-parler compatibility: if this model is translatable,
-            # ensure its fields are set to readonly too.
-            if hasattr(self.model, '_parler_meta'):
-                readonly_fields += list(
-                    self.model._parler_meta._fields_to_model.keys()
-                )
+            readonly_fields = tuple(readonly_fields)
+            return self._compile_view_layout(
+                ('readonly_fields', readonly_fields),
+                lambda: self._compile_readonly_fields(readonly_fields))
 
         return tuple(readonly_fields)
 
@@ -228,20 +687,34 @@ class AdminViewPermissionBaseModelAdmin(admin.options.BaseModelAdmin):
 
         if self._has_change_only_permission(request):
             return actions
-        elif can_delete:
+
+        allowed_actions = set()
+        if can_delete:
             # If user has no change permission, but has delete
             # We assume that self.admin_site.actions contains "delete" action
-            return OrderedDict(
-                (name, (func, name, desc))
-                for func, name, desc in actions.values()
-                if name in dict(self.admin_site.actions).keys()
+            allowed_actions.update(dict(self.admin_site.actions).keys())
+        if self.has_view_permission(request):
+            # The actions which only read the objects, eg. the export actions
+            allowed_actions.update(
+                name for func, name, desc in actions.values()
+                if 'view' in getattr(func, 'allowed_permissions', ())
             )
 
-        return OrderedDict()
+        return OrderedDict(
+            (name, (func, name, desc))
+            for func, name, desc in actions.values()
+            if name in allowed_actions
+        )
 
 
 class AdminViewPermissionInlineModelAdmin(AdminViewPermissionBaseModelAdmin,
                                           admin.options.InlineModelAdmin):
+    # Render the inline of the view only users from a single queryset,
+    # without building the formset, whenever every field is readonly
+    view_only_skip_formset = True
+    # Paginate the objects of the inline rendered without the formset
+    view_only_per_page = None
+
     def get_queryset(self, request):
         """
         Returns a QuerySet of all model instances that can be edited by the
@@ -258,22 +731,118 @@ class AdminViewPermissionInlineModelAdmin(AdminViewPermissionBaseModelAdmin,
             return super(AdminViewPermissionInlineModelAdmin, self)\
                 .get_queryset(request)
 
+    def get_view_only_formset(self, request, obj=None):
+        """
+        Return a ViewOnlyInlineFormSet class if the inline can be rendered
+        without the formset, otherwise None. The formset is needed when the
+        user can add or change the objects, when the formset, the form or
+        the template are customized or when a field isn't readonly
+        """
+        if not self.view_only_skip_formset or request.method != 'GET':
+            return None
+
+        if not self.has_view_permission(request, obj) or \
+                self._has_change_only_permission(request, obj) or \
+                self.has_add_permission(request):
+            return None
+
+        if self.template not in VIEW_ONLY_INLINE_TEMPLATES or \
+                self.formset is not BaseInlineFormSet or \
+                get_function(self.get_formset) is not get_function(
+                    admin.options.InlineModelAdmin.get_formset):
+            return None
+
+        if getattr(self.form, 'declared_fields', None) or \
+                hasattr(self.form, 'Media'):
+            return None
+
+        fk = _get_foreign_key(self.parent_model, self.model,
+                              fk_name=self.fk_name)
+        readonly_fields = set(self.get_readonly_fields(request, obj))
+        readonly_fields.add(fk.name)
+        if any(field not in readonly_fields for field in flatten_fieldsets(
+                self.get_fieldsets(request, obj))):
+            return None
+
+        select_related, prefetch_related = self.get_view_only_relations(
+            request, obj)
+        attrs = {
+            'model': self.model,
+            'fk': fk,
+            # The parent object isn't rendered
+            'select_related': tuple(
+                f for f in select_related if f != fk.name),
+            'prefetch_related': prefetch_related,
+            'per_page': self.view_only_per_page,
+            'params': request.GET,
+        }
+        return type(str('%sViewOnlyFormSet' % self.model.__name__),
+                    (ViewOnlyInlineFormSet, ), attrs)
+
 
 class AdminViewPermissionModelAdmin(AdminViewPermissionBaseModelAdmin,
                                     admin.ModelAdmin):
+    # Render the change view of the view only users without building the
+    # ModelForm, whenever every field is readonly
+    view_only_skip_form = True
+    # The pagination of the changelist of the view only users. The COUNTLESS
+    # and KEYSET modes of ChangeListPagination never count the objects
+    view_only_pagination = ChangeListPagination.OFFSET
+    # The version of the object, a field name or a callable which takes the
+    # object, which answers the conditional requests of the view only users
+    view_only_etag_source = None
+
+    def __init__(self, *args, **kwargs):
+        super(AdminViewPermissionModelAdmin, self).__init__(*args, **kwargs)
+        self._inline_classes = {}
+
     def get_changelist(self, request, **kwargs):
         """
         Returns the ChangeList class for use on the changelist page.
         """
         return AdminViewPermissionChangeList
 
+    def changelist_view(self, request, extra_context=None):
+        """
+        Render the pagination of the countless and keyset changelists with
+        previous and next links. The template of the changelist is extended,
+        so its overrides still apply
+        """
+        response = super(AdminViewPermissionModelAdmin, self).changelist_view(
+            request, extra_context)
+        if not isinstance(response, TemplateResponse) or \
+                response.context_data is None:
+            return response
+
+        cl = response.context_data.get('cl')
+        if getattr(cl, 'pagination', ChangeListPagination.OFFSET) != \
+                ChangeListPagination.OFFSET:
+            response.context_data['base_change_list_template'] = \
+                response.resolve_template(response.template_name)
+            response.template_name = 'admin_view_permission/change_list.html'
+
+        return response
+
+    def _get_inline_class(self, inline_class):
+        """
+        Return the view permission aware class of the given inline. The class
+        is created once and reused on every request
+        """
+        try:
+            return self._inline_classes[inline_class]
+        except KeyError:
+            attrs = dict(inline_class.__dict__)
+            attrs['_view_layouts'] = {}
+            new_class = self._inline_classes[inline_class] = type(
+                str('DynamicAdminViewPermissionInlineModelAdmin'),
+                (inline_class, AdminViewPermissionInlineModelAdmin),
+                attrs)
+            return new_class
+
     def get_inline_instances(self, request, obj=None):
         inline_instances = []
         for inline_class in self.inlines:
-            new_class = type(
-                str('DynamicAdminViewPermissionInlineModelAdmin'),
-                (inline_class, AdminViewPermissionInlineModelAdmin),
-                dict(inline_class.__dict__))
+            new_class = self._get_inline_class(inline_class)
 
             inline = new_class(self.model, self.admin_site)
             if request:
@@ -291,6 +860,81 @@ class AdminViewPermissionModelAdmin(AdminViewPermissionBaseModelAdmin,
 
         return inline_instances
 
+    def get_formsets_with_inlines(self, request, obj=None):
+        """
+        Yield the formsets and the corresponding inlines. The view only
+        inlines get a ViewOnlyInlineFormSet instead of the formset when the
+        page has nothing to save, since it has no management form
+        """
+        view_only = getattr(request, VIEW_ONLY_REQUEST_ATTR, False)
+        for inline in self.get_inline_instances(request, obj):
+            formset = None
+            if view_only and \
+                    isinstance(inline, AdminViewPermissionInlineModelAdmin):
+                formset = inline.get_view_only_formset(request, obj)
+
+            yield formset or inline.get_formset(request, obj), inline
+
+    def get_inline_formsets(self, request, formsets, inline_instances,
+                            obj=None):
+        inline_admin_formsets = []
+        for inline, formset in zip(inline_instances, formsets):
+            if isinstance(formset, ViewOnlyInlineFormSet):
+                inline_admin_formsets.append(ViewOnlyInlineAdminFormSet(
+                    inline, formset,
+                    list(inline.get_fieldsets(request, obj)),
+                    inline.get_readonly_fields(request, obj),
+                    model_admin=self))
+            else:
+                inline_admin_formsets.extend(super(
+                    AdminViewPermissionModelAdmin, self).get_inline_formsets(
+                        request, [formset], [inline], obj))
+
+        return inline_admin_formsets
+
+    def _get_change_view_object(self, request, object_id, from_field=None):
+        """
+        Fetch the object of change_view. The object of the view only users is
+        fetched along with its readonly relations, unless get_object is
+        customized
+        """
+        if get_function(self.get_object) is not get_function(
+                AdminViewPermissionModelAdmin.get_object) or \
+                not self.has_view_permission(request) or \
+                self._has_change_only_permission(request):
+            return self.get_object(request, object_id, from_field)
+
+        queryset = self.get_queryset(request)
+        select_related, prefetch_related = self.get_view_only_relations(
+            request)
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        # Taken from django.contrib.admin.options.ModelAdmin#get_object
+        model = queryset.model
+        field = model._meta.pk if from_field is None else \
+            model._meta.get_field(from_field)
+        try:
+            object_id = field.to_python(object_id)
+            return queryset.get(**{field.name: object_id})
+        except (model.DoesNotExist, ValidationError, ValueError):
+            return None
+
+    def get_object(self, request, object_id, from_field=None):
+        """
+        Return the object fetched by change_view if it was fetched for the
+        same lookup, so the parent view doesn't have to query it again
+        """
+        key, obj = getattr(request, CHANGE_VIEW_OBJECT_ATTR, (None, None))
+        if key == (self.model, object_id, from_field):
+            delattr(request, CHANGE_VIEW_OBJECT_ATTR)
+            return obj
+
+        return super(AdminViewPermissionModelAdmin, self).get_object(
+            request, object_id, from_field)
+
     def change_view(self, request, object_id, form_url='', extra_context=None):
         """
         Override this function to hide the sumbit row from the user who has
@@ -302,10 +946,14 @@ class AdminViewPermissionModelAdmin(AdminViewPermissionBaseModelAdmin,
         model = self.model
         opts = model._meta
 
-        # TODO: Overriding the change_view costs 1 query more (one from us
-        # and another from the super)
-        obj = self.get_object(request, unquote(object_id), to_field)
+        obj = self._get_change_view_object(
+            request, unquote(object_id), to_field)
+        # Hand the object over to the get_object call of changeform_view
+        setattr(request, CHANGE_VIEW_OBJECT_ATTR,
+                ((model, unquote(object_id), to_field), obj))
 
+        # Whether the page has nothing to save
+        view_only = False
         if self.has_view_permission(request, obj) and \
                 not self._has_change_only_permission(request, obj):
             extra_context = extra_context or {}
@@ -324,19 +972,176 @@ class AdminViewPermissionModelAdmin(AdminViewPermissionBaseModelAdmin,
                     extra_context['show_save'] = True
                     extra_context['show_save_and_continue'] = True
                     break
+            view_only = not extra_context['show_save']
+        setattr(request, VIEW_ONLY_REQUEST_ATTR, view_only)
+
+        # A disallowed to_field gets the error of changeform_view, it must
+        # not reveal whether an object has the given value. The ETag holds
+        # the permission fingerprint, which stands for the has_perm answers
+        # only when the backends resolve them from the permission set
+        etag, last_modified = None, None
+        if view_only and obj is not None and \
+                request.method in ('GET', 'HEAD') and \
+                self.view_only_etag_source is not None and \
+                get_conditional_response is not None and \
+                can_use_permission_index(request.user) and \
+                not (to_field and
+                     not self.to_field_allowed(request, to_field)):
+            etag, last_modified = self.get_view_only_validators(request, obj)
+
+        try:
+            if etag is not None:
+                # Answer before building the form and the inlines. The ETags
+                # of the request are unquoted before django 1.11
+                response = get_conditional_response(
+                    request,
+                    etag=quote_etag(etag)
+                    if DJANGO_VERSION >= DjangoVersion.DJANGO_111 else etag,
+                    last_modified=last_modified)
+                if response is not None:
+                    return self._set_validators(
+                        response, etag, last_modified)
+
+            if view_only:
+                layout = self._get_view_only_layout(request, obj, to_field)
+                if layout is not None:
+                    response = self._view_only_change_view(
+                        request, object_id, obj, to_field, layout, form_url,
+                        extra_context)
+                    return self._set_validators(
+                        response, etag, last_modified)
+
+            response = super(AdminViewPermissionModelAdmin, self).change_view(
+                request, object_id, form_url, extra_context)
+            return self._set_validators(response, etag, last_modified)
+        finally:
+            if hasattr(request, CHANGE_VIEW_OBJECT_ATTR):
+                delattr(request, CHANGE_VIEW_OBJECT_ATTR)
+            delattr(request, VIEW_ONLY_REQUEST_ATTR)
+
+    def get_view_only_version(self, obj):
+        """
+        Return the version of the object from the view_only_etag_source
+        """
+        source = self.view_only_etag_source
+        if callable(source):
+            return source(obj)
 
-        return super(AdminViewPermissionModelAdmin, self).change_view(
-            request, object_id, form_url, extra_context)
+        return getattr(obj, source)
 
-    def changelist_view(self, request, extra_context=None):
-        resp = super(AdminViewPermissionModelAdmin, self).changelist_view(
-            request, extra_context)
-        if self.has_view_permission(request) and \
-                not self._has_change_only_permission(request):
-            if hasattr(resp, 'context_data') and 'cl' in resp.context_data:
-                resp.context_data['cl'].formset = None
+    def get_view_only_validators(self, request, obj):
+        """
+        Return the ETag and the Last-Modified timestamp of the change view of
+        a view only user. The ETag changes with the version of the object, the
+        permissions of the user and the language. The timestamp is set only
+        if the version is a datetime
+        """
+        version = self.get_view_only_version(obj)
+        if version is None:
+            return None, None
+
+        last_modified = None
+        if isinstance(version, datetime.datetime):
+            if timezone.is_naive(version):
+                version = timezone.make_aware(
+                    version, timezone.get_default_timezone())
+            last_modified = calendar.timegm(version.utctimetuple())
+
+        etag = hashlib.md5(force_bytes('\n'.join([
+            force_text(obj.pk),
+            force_text(version),
+            get_permission_fingerprint(request.user),
+            get_language() or '',
+        ]))).hexdigest()
+
+        return etag, last_modified
+
+    def _set_validators(self, response, etag, last_modified):
+        if etag is None or not (
+                200 <= response.status_code < 300 or
+                response.status_code == 304):
+            return response
+
+        response['ETag'] = quote_etag(etag)
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # The admin site lets the browser store the response, so it sends
+        # the validators on the following requests
+        setattr(response, REVALIDATE_RESPONSE_ATTR, True)
+        return response
+
+    def _get_view_only_layout(self, request, obj, to_field):
+        """
+        Return the fieldsets and the readonly fields of the view only change
+        view if it can be rendered without the ModelForm, otherwise None. The
+        form is needed when it is customized or when a field isn't readonly
+        """
+        if not self.view_only_skip_form or request.method != 'GET' or \
+                obj is None:
+            return None
+
+        if to_field and not self.to_field_allowed(request, to_field):
+            return None
+
+        for name in ('changeform_view', '_changeform_view', 'get_form'):
+            if get_function(getattr(self, name, None)) is not get_function(
+                    getattr(admin.ModelAdmin, name, None)):
+                return None
 
-        return resp
+        if getattr(self.form, 'declared_fields', None) or \
+                hasattr(self.form, 'Media'):
+            return None
+
+        if self.get_prepopulated_fields(request, obj):
+            return None
+
+        readonly_fields = self.get_readonly_fields(request, obj)
+        fieldsets = list(self.get_fieldsets(request, obj))
+        readonly_field_names = set(readonly_fields)
+        if any(field not in readonly_field_names
+               for field in flatten_fieldsets(fieldsets)):
+            return None
+
+        return fieldsets, readonly_fields
+
+    @csrf_protect_m
+    def _view_only_change_view(self, request, object_id, obj, to_field,
+                               layout, form_url, extra_context):
+        """
+        Render the change view of a view only user like changeform_view does,
+        using a ViewOnlyForm instead of the ModelForm
+        """
+        fieldsets, readonly_fields = layout
+        form = ViewOnlyForm(obj, self.form)
+        formsets, inline_instances = self._create_formsets(
+            request, obj, change=True)
+
+        adminForm = helpers.AdminForm(
+            form, fieldsets, {}, readonly_fields, model_admin=self)
+        media = self.media + adminForm.media
+
+        inline_formsets = self.get_inline_formsets(
+            request, formsets, inline_instances, obj)
+        for inline_formset in inline_formsets:
+            media = media + inline_formset.media
+
+        context = dict(
+            self.admin_site.each_context(request),
+            adminform=adminForm,
+            object_id=object_id,
+            original=obj,
+            is_popup=IS_POPUP_VAR in request.GET,
+            to_field=to_field,
+            media=media,
+            inline_admin_formsets=inline_formsets,
+            errors=helpers.AdminErrorList(form, formsets),
+            preserved_filters=self.get_preserved_filters(request),
+        )
+        context.update(extra_context)
+
+        return self.render_change_form(
+            request, context, add=False, change=True, obj=obj,
+            form_url=form_url)
 
 
 class AdminViewPermissionUserAdmin(AdminViewPermissionModelAdmin):
@@ -381,7 +1186,69 @@ class AdminViewPermissionUserAdmin(AdminViewPermissionModelAdmin):
         return form
 
 
+def _has_default_permissions(model_admin):
+    """
+    Return True if the model admin uses the module and model permission
+    methods of the django admin, or of AdminViewPermissionBaseModelAdmin
+    """
+    if get_function(model_admin.has_module_permission) is not get_function(
+            admin.ModelAdmin.has_module_permission):
+        return False
+
+    if isinstance(model_admin, AdminViewPermissionBaseModelAdmin):
+        return model_admin._has_default_permissions()
+
+    # The models left out of ADMIN_VIEW_PERMISSION_MODELS are registered with
+    # their own model admin
+    for name in ('get_model_perms', 'has_view_permission'):
+        if get_function(getattr(model_admin, name, None)) is not get_function(
+                getattr(admin.ModelAdmin, name, None)):
+            return False
+
+    return all(
+        is_admin_permission_method(
+            getattr(model_admin, 'has_%s_permission' % action), action)
+        for action in ('add', 'change', 'delete'))
+
+
 class AdminViewPermissionAdminSite(admin.AdminSite):
+    # Cache the app dict of the index and app_index pages per permission
+    # fingerprint. The cache is skipped while a model admin overrides its
+    # module or model permission methods, disable it if the permissions
+    # depend on anything else than the user permissions anyway
+    cache_app_dict = True
+
+    def __init__(self, *args, **kwargs):
+        super(AdminViewPermissionAdminSite, self).__init__(*args, **kwargs)
+        self._registry_digest = None
+        self._app_dict_cacheable = None
+        self._urls = {}
+        # The registry indexed by app_label, built on first use and rebuilt
+        # when the registry changes
+        self._app_registry = None
+        self._indexed_registry = None
+        self._indexed_registry_size = 0
+
+    def admin_view(self, view, cacheable=False):
+        """
+        Replace the never cache headers of the responses which carry the
+        validators of a view only change view, so the browser stores them
+        and revalidates them on every request
+        """
+        inner = super(AdminViewPermissionAdminSite, self).admin_view(
+            view, cacheable)
+        if cacheable:
+            return inner
+
+        def wrapper(request, *args, **kwargs):
+            response = inner(request, *args, **kwargs)
+            if getattr(response, REVALIDATE_RESPONSE_ATTR, False):
+                response['Cache-Control'] = \
+                    'max-age=0, no-cache, must-revalidate, private'
+            return response
+
+        return update_wrapper(wrapper, inner)
+
     def _get_admin_class(self, admin_class, is_user_model):
         if admin_class:
             if is_user_model:
@@ -424,36 +1291,192 @@ class AdminViewPermissionAdminSite(admin.AdminSite):
         is_user_model = settings.AUTH_USER_MODEL in [
             get_model_name(i) for i in models]
 
-        if SETTINGS_MODELS or (SETTINGS_MODELS is not None and len(
-                SETTINGS_MODELS) == 0):
-            for model in models:
-                model_name = get_model_name(model)
-                if model_name in SETTINGS_MODELS:
-                    admin_class = self._get_admin_class(
-                        admin_class, is_user_model)
-
+        try:
+            if SETTINGS_MODELS or (SETTINGS_MODELS is not None and len(
+                    SETTINGS_MODELS) == 0):
+                for model in models:
+                    model_name = get_model_name(model)
+                    if model_name in SETTINGS_MODELS:
+                        admin_class = self._get_admin_class(
+                            admin_class, is_user_model)
+
+                    super(AdminViewPermissionAdminSite, self).register(
+                        [model], admin_class, **options)
+            else:
+                admin_class = self._get_admin_class(admin_class, is_user_model)
                 super(AdminViewPermissionAdminSite, self).register(
-                    [model], admin_class, **options)
+                    model_or_iterable, admin_class, **options)
+        finally:
+            self._registry_changed()
+
+    def unregister(self, model_or_iterable):
+        try:
+            super(AdminViewPermissionAdminSite, self).unregister(
+                model_or_iterable)
+        finally:
+            self._registry_changed()
+
+    def _registry_changed(self):
+        """
+        Reset everything that is derived from the registry. Call it after
+        replacing model admins of _registry by hand, the other changes are
+        detected by _sync_registry
+        """
+        self._app_registry = None
+        self._registry_digest = None
+        self._app_dict_cacheable = None
+        self._urls = {}
+
+    def _reverse(self, viewname, **kwargs):
+        """
+        Reverse the given admin url once per urlconf and language and keep
+        the result, instead of resolving it on every request. Raises
+        NoReverseMatch as reverse does
+        """
+        # The language prefix of i18n_patterns depends on the language
+        key = (get_urlconf() or settings.ROOT_URLCONF, get_script_prefix(),
+               get_language(), viewname, tuple(sorted(kwargs.items())))
+        try:
+            url = self._urls[key]
+        except KeyError:
+            try:
+                url = reverse(viewname, kwargs=kwargs or None,
+                              current_app=self.name)
+            except NoReverseMatch:
+                url = None
+            self._urls[key] = url
+
+        if url is None:
+            raise NoReverseMatch(
+                "Reverse for '%s' not found." % viewname)
+
+        return url
+
+    def _sync_registry(self):
+        """
+        Build the app_label index of the registry. It is rebuilt, and what is
+        derived from the registry is reset, when the registry was changed
+        without register and unregister, eg. by copying the registry of
+        another site. Such changes are detected by the identity and the size
+        of the registry, so the check costs the same whatever its size
+        """
+        if self._app_registry is not None and \
+                self._indexed_registry is self._registry and \
+                self._indexed_registry_size == len(self._registry):
+            return
+
+        self._registry_changed()
+        app_registry = {}
+        for model, model_admin in self._registry.items():
+            app_registry.setdefault(
+                model._meta.app_label, {})[model] = model_admin
+        self._app_registry = app_registry
+        self._indexed_registry = self._registry
+        self._indexed_registry_size = len(self._registry)
+
+    def _get_app_models(self, label):
+        """
+        Return the registered models of the given app label and their model
+        admins
+        """
+        self._sync_registry()
+        return self._app_registry.get(label, {})
+
+    def get_permission_matrix(self, request, label=None):
+        """
+        Return the add, change, delete and view permissions of the request
+        user for every registered model, or for the models of the given app
+        label. The permissions are resolved in one pass from the permission
+        index; the model admins which override the permission methods fall
+        back to get_model_perms
+        """
+        if label:
+            models = self._get_app_models(label)
         else:
-            admin_class = self._get_admin_class(admin_class, is_user_model)
-            super(AdminViewPermissionAdminSite, self).register(
-                model_or_iterable, admin_class, **options)
+            models = self._registry
+
+        matrix = {}
+        for model, model_admin in models.items():
+            perms = None
+            # The models left out of ADMIN_VIEW_PERMISSION_MODELS are
+            # registered with their own model admin
+            if isinstance(model_admin, AdminViewPermissionBaseModelAdmin):
+                perms = model_admin._get_indexed_model_perms(request)
+            matrix[model] = perms or model_admin.get_model_perms(request)
+
+        return matrix
+
+    def _get_registry_digest(self):
+        if self._registry_digest is None:
+            self._registry_digest = hashlib.md5(force_bytes(','.join(sorted(
+                get_model_name(model) for model in self._registry
+            )))).hexdigest()
+
+        return self._registry_digest
+
+    def _is_app_dict_cacheable(self):
+        """
+        Return True if the app dict depends on the permissions of the user
+        only, that is if no model admin overrides the module or the model
+        permission methods
+        """
+        if self._app_dict_cacheable is None:
+            self._app_dict_cacheable = all(
+                _has_default_permissions(model_admin)
+                for model_admin in self._registry.values())
+
+        return self._app_dict_cacheable
+
+    def _get_app_dict_cache_key(self, request, label=None):
+        urlconf = get_urlconf() or settings.ROOT_URLCONF
+        return ':'.join(force_text(part) for part in (
+            CACHE_KEY_PREFIX,
+            'app_dict',
+            get_cache_generation(),
+            self.name,
+            self._get_registry_digest(),
+            getattr(urlconf, '__name__', urlconf),
+            get_script_prefix(),
+            get_language(),
+            label or '',
+            get_permission_fingerprint(request.user),
+        ))
 
     def _build_app_dict(self, request, label=None):
         """
         Builds the app dictionary. Takes an optional label parameters to filter
-        models of a specific app.
+        models of a specific app. The result is cached per permission
+        fingerprint, so users with the same permissions share it.
         """
+        if not self.cache_app_dict:
+            return self._get_app_dict(request, label)
+
+        # The permission fingerprint stands for the has_perm answers only
+        # when the backends resolve them from the permission set
+        self._sync_registry()
+        if not self._is_app_dict_cacheable() or \
+                not can_use_permission_index(request.user):
+            return self._get_app_dict(request, label)
+
+        cache = get_cache()
+        key = self._get_app_dict_cache_key(request, label)
+        cached = cache.get(key)
+        if cached is None:
+            # Wrap the app dict, since it is None for empty app_index pages
+            cached = (self._get_app_dict(request, label), )
+            cache.set(key, cached)
+
+        return cached[0]
+
+    def _get_app_dict(self, request, label=None):
         app_dict = {}
 
         if label:
-            models = {
-                m: m_a for m, m_a in self._registry.items()
-                if m._meta.app_label == label
-            }
+            models = self._get_app_models(label)
         else:
             models = self._registry
 
+        matrix = None
         for model, model_admin in models.items():
             app_label = model._meta.app_label
 
@@ -463,7 +1486,9 @@ class AdminViewPermissionAdminSite(admin.AdminSite):
                     raise PermissionDenied
                 continue
 
-            perms = model_admin.get_model_perms(request)
+            if matrix is None:
+                matrix = self.get_permission_matrix(request, label)
+            perms = matrix[model]
 
             # Check whether user has any perm for this module.
             # If so, add the module to the model_list.
@@ -472,20 +1497,20 @@ class AdminViewPermissionAdminSite(admin.AdminSite):
 
             info = (app_label, model._meta.model_name)
             model_dict = {
-                'name': capfirst(model._meta.verbose_name_plural),
+                'name': force_text(capfirst(model._meta.verbose_name_plural)),
                 'object_name': model._meta.object_name,
                 'perms': perms,
             }
             if perms.get('change') or perms.get('view'):
                 try:
-                    model_dict['admin_url'] = reverse(
-                        'admin:%s_%s_changelist' % info, current_app=self.name)
+                    model_dict['admin_url'] = self._reverse(
+                        'admin:%s_%s_changelist' % info)
                 except NoReverseMatch:
                     pass
             if perms.get('add'):
                 try:
-                    model_dict['add_url'] = reverse('admin:%s_%s_add' % info,
-                                                    current_app=self.name)
+                    model_dict['add_url'] = self._reverse(
+                        'admin:%s_%s_add' % info)
                 except NoReverseMatch:
                     pass
 
@@ -493,13 +1518,11 @@ class AdminViewPermissionAdminSite(admin.AdminSite):
                 app_dict[app_label]['models'].append(model_dict)
             else:
                 app_dict[app_label] = {
-                    'name': apps.get_app_config(app_label).verbose_name,
+                    'name': force_text(
+                        apps.get_app_config(app_label).verbose_name),
                     'app_label': app_label,
-                    'app_url': reverse(
-                        'admin:app_list',
-                        kwargs={'app_label': app_label},
-                        current_app=self.name,
-                    ),
+                    'app_url': self._reverse(
+                        'admin:app_list', app_label=app_label),
                     'has_module_perms': has_module_perms,
                     'models': [model_dict],
                 }
@@ -1,47 +1,96 @@
 from __future__ import unicode_literals
 
+import time
 import warnings
 
 from django.apps import AppConfig
 from django.apps import apps as global_apps
 from django.conf import settings
 from django.contrib import admin
-from django.db.models.signals import post_migrate
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+)
 
 from .admin import AdminViewPermissionAdminSite
+from .cache import invalidate_cache
 from .enums import DjangoVersion
-from .utils import django_version, get_model_name
+from .utils import DJANGO_VERSION, get_model_name
+
+VIEW_PERMISSION_MARKER = '_admin_view_permission_added'
 
 
 def update_permissions(sender, app_config, verbosity, apps=global_apps,
                        **kwargs):
+    """
+    Add the view permission to the models. The post_migrate signal is sent
+    once per app, but the first call handles the models of every app and
+    marks them, so the following calls of the same migrate run skip them
+    """
     settings_models = getattr(settings, 'ADMIN_VIEW_PERMISSION_MODELS', None)
+    if settings_models is not None:
+        settings_models = set(settings_models)
+
+    start = time.time()
+    updated_models = 0
+    for model in apps.get_models():
+        opts = model._meta
+        if getattr(opts, VIEW_PERMISSION_MARKER, False):
+            continue
+
+        if settings_models is not None and \
+                get_model_name(model) not in settings_models:
+            continue
+
+        view_permission = 'view_%s' % opts.model_name
+        if view_permission not in {perm[0] for perm in opts.permissions}:
+            opts.permissions += (
+                (view_permission, 'Can view %s' % opts.model_name),)
+            updated_models += 1
+
+        setattr(opts, VIEW_PERMISSION_MARKER, True)
+
+    if verbosity >= 2 and updated_models:
+        print('Added the view permission to %d models in %.3fs' % (
+            updated_models, time.time() - start))
+
+
+def connect_cache_signals():
+    """
+    Invalidate the cached entries whenever the permissions, the groups or
+    their assignments change
+    """
+    from django.contrib.auth.models import Group, Permission
+
+    User = get_user_model()
+    m2m_fields = [Group.permissions]
+    for field_name in ('groups', 'user_permissions'):
+        if hasattr(User, field_name):
+            m2m_fields.append(getattr(User, field_name))
+
+    for m2m_field in m2m_fields:
+        m2m_changed.connect(
+            invalidate_cache, sender=m2m_field.through,
+            dispatch_uid='admin_view_permission_%s_%s' % (
+                m2m_field.through._meta.app_label,
+                m2m_field.through._meta.model_name))
 
-    # TODO: Maybe look at the registry not in all models
-    for app in apps.get_app_configs():
-        for model in app.get_models():
-            view_permission = 'view_%s' % model._meta.model_name
-            if settings_models or (settings_models is not None and len(
-                    settings_models) == 0):
-                model_name = get_model_name(model)
-                if model_name in settings_models and view_permission not in \
-                        [perm[0] for perm in model._meta.permissions]:
-                    model._meta.permissions += (
-                        (view_permission,
-                         'Can view %s' % model._meta.model_name),)
-            else:
-                if view_permission not in [perm[0] for perm in
-                                           model._meta.permissions]:
-                    model._meta.permissions += (
-                        ('view_%s' % model._meta.model_name,
-                         'Can view %s' % model._meta.model_name),)
+    for model in (Group, Permission):
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_cache, sender=model,
+                dispatch_uid='admin_view_permission_%s_%s' % (
+                    model._meta.app_label, model._meta.model_name))
 
 
 class AdminViewPermissionConfig(AppConfig):
     name = 'admin_view_permission'
 
     def ready(self):
-        if django_version() == DjangoVersion.DJANGO_21:
+        if DJANGO_VERSION == DjangoVersion.DJANGO_21:
             # Disable silently the package for Django => 2.1. We don't override
             # admin_site neither the default ModelAdmin.
             warnings.warn(
@@ -56,3 +105,4 @@ class AdminViewPermissionConfig(AppConfig):
             admin.sites.site = admin.site
 
         post_migrate.connect(update_permissions)
+        connect_cache_signals()
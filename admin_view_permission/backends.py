@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+import warnings
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache.backends.locmem import LocMemCache
+
+from .cache import CACHE_KEY_PREFIX, get_cache, get_cache_generation
+from .utils import is_anonymous
+
+_local_cache_warned = False
+
+
+def get_user_permissions_cache_key(user_obj):
+    return '%s:perms:%s:%s:%d' % (
+        CACHE_KEY_PREFIX, get_cache_generation(), user_obj.pk,
+        user_obj.is_superuser)
+
+
+def _warn_local_cache(cache):
+    global _local_cache_warned
+
+    # The invalidation of a local memory cache reaches only the process which
+    # changed the permissions
+    if isinstance(cache, LocMemCache) and not _local_cache_warned:
+        _local_cache_warned = True
+        warnings.warn(
+            'The CachedModelBackend keeps the permissions in a local memory '
+            'cache, which other processes do not invalidate. Set '
+            'ADMIN_VIEW_PERMISSION_CACHE to a shared cache when the site runs '
+            'in several processes.',
+            RuntimeWarning
+        )
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    A ModelBackend which keeps the permission set of the users in the cache
+    defined by the ADMIN_VIEW_PERMISSION_CACHE setting. The entries are
+    invalidated whenever a permission, a group or their assignments change
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or is_anonymous(user_obj) or \
+                obj is not None:
+            return set()
+
+        if not hasattr(user_obj, '_perm_cache'):
+            cache = get_cache()
+            _warn_local_cache(cache)
+            key = get_user_permissions_cache_key(user_obj)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super(CachedModelBackend, self).get_all_permissions(
+                    user_obj, obj)
+                cache.set(key, perms)
+            user_obj._perm_cache = perms
+
+        return user_obj._perm_cache
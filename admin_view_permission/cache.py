@@ -0,0 +1,138 @@
+from __future__ import unicode_literals
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils.encoding import force_bytes
+
+from .enums import DjangoVersion
+from .utils import DJANGO_VERSION
+
+REQUEST_PERMISSION_CACHE_ATTR = '_admin_view_permission_cache'
+CACHE_KEY_PREFIX = 'admin_view_permission'
+GENERATION_CACHE_KEY = '%s:generation' % CACHE_KEY_PREFIX
+
+_local_cache = None
+
+
+class PermissionCache(object):
+    """
+    Store the permission decisions taken while serving a single request. The
+    ``hits`` and ``misses`` counters can be used to inspect the hit rate. The
+    ``permission_bitset`` holds the permissions of the user in the bits of
+    the permission index.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.decisions = {}
+        self.hits = 0
+        self.misses = 0
+        self.permission_bitset = None
+
+    def get_or_set(self, key, func):
+        try:
+            decision = self.decisions[key]
+        except KeyError:
+            self.misses += 1
+            decision = self.decisions[key] = func()
+        else:
+            self.hits += 1
+
+        return decision
+
+    def clear(self):
+        self.decisions.clear()
+        self.hits = 0
+        self.misses = 0
+        self.permission_bitset = None
+
+
+def get_permission_cache(request):
+    """
+    Return the permission cache attached to the request. A new cache is
+    created whenever the request user changes (eg. after a login)
+    """
+    cache = getattr(request, REQUEST_PERMISSION_CACHE_ATTR, None)
+    user = getattr(request, 'user', None)
+    if cache is None or cache.user is not user:
+        cache = PermissionCache(user)
+        setattr(request, REQUEST_PERMISSION_CACHE_ATTR, cache)
+
+    return cache
+
+
+def get_cache():
+    """
+    Return the cache defined by the ADMIN_VIEW_PERMISSION_CACHE setting or a
+    local memory cache if the setting is not defined
+    """
+    global _local_cache
+
+    alias = getattr(settings, 'ADMIN_VIEW_PERMISSION_CACHE', None)
+    if alias:
+        return caches[alias]
+
+    if _local_cache is None:
+        _local_cache = LocMemCache(CACHE_KEY_PREFIX, {})
+
+    return _local_cache
+
+
+def get_cache_generation():
+    """
+    Return the generation of the cached entries. Every cache key contains
+    the generation, so increasing it invalidates all the entries at once
+    """
+    cache = get_cache()
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        _reset_cache_generation(cache)
+        generation = cache.get(GENERATION_CACHE_KEY)
+
+    return generation
+
+
+def _reset_cache_generation(cache):
+    # Start from the current time, so an evicted generation never comes back
+    cache.add(GENERATION_CACHE_KEY, int(time.time() * 1000), None)
+
+
+def _increase_cache_generation():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        _reset_cache_generation(cache)
+
+
+def invalidate_cache(**kwargs):
+    """
+    Signal receiver which invalidates the cached entries when the permissions
+    or the group assignments change
+    """
+    _increase_cache_generation()
+    # Until the change is committed, a concurrent request may cache the
+    # previous permissions under the new generation, so it is increased
+    # again on commit
+    if DJANGO_VERSION >= DjangoVersion.DJANGO_19:
+        transaction.on_commit(
+            _increase_cache_generation, using=kwargs.get('using'))
+
+
+def get_permission_fingerprint(user):
+    """
+    Return a digest of the effective permission set of the user. Users with
+    the same permissions get the same fingerprint
+    """
+    if not user.is_active:
+        return 'inactive'
+    if user.is_superuser:
+        return 'superuser'
+
+    perms = sorted(user.get_all_permissions())
+    return hashlib.md5(force_bytes('\n'.join(perms))).hexdigest()
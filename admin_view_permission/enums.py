@@ -4,3 +4,7 @@ from __future__ import unicode_literals
 class DjangoVersion(object):
     (DJANGO_18, DJANGO_19, DJANGO_110, DJANGO_111, DJANGO_20,
      DJANGO_21) = range(0, 6)
+
+
+class ChangeListPagination(object):
+    (OFFSET, COUNTLESS, KEYSET) = range(0, 3)
@@ -0,0 +1,249 @@
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from django import forms
+from django.contrib.admin import helpers
+from django.contrib.admin.utils import (
+    flatten_fieldsets,
+    help_text_for_field,
+    label_for_field,
+)
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict, ErrorList
+from django.http import QueryDict
+from django.utils.encoding import force_text
+
+from .enums import DjangoVersion
+from .utils import DJANGO_VERSION
+
+# The templates of the view only inlines, by the template of the inline
+VIEW_ONLY_INLINE_TEMPLATES = {
+    'admin/edit_inline/tabular.html':
+        'admin_view_permission/edit_inline/tabular.html',
+    'admin/edit_inline/stacked.html':
+        'admin_view_permission/edit_inline/stacked.html',
+}
+
+# The help icon of the tabular inlines, an svg since django 1.9
+if DJANGO_VERSION < DjangoVersion.DJANGO_19:
+    HELP_ICON = 'admin/img/icon-unknown.gif'
+else:
+    HELP_ICON = 'admin/img/icon-unknown.svg'
+
+ViewOnlyFormOptions = namedtuple(
+    'ViewOnlyFormOptions', 'model, labels, help_texts')
+
+
+class ViewOnlyForm(object):
+    """
+    Stand-in for the ModelForm of the change view when every field is
+    readonly. AdminForm and AdminReadonlyField read the values straight from
+    the instance, so the form is never built
+    """
+    is_bound = False
+    fields = {}
+    media = forms.Media()
+
+    def __init__(self, instance, form_class):
+        meta = getattr(form_class, '_meta', None)
+        self.instance = instance
+        self._meta = ViewOnlyFormOptions(
+            type(instance),
+            getattr(meta, 'labels', None),
+            getattr(meta, 'help_texts', None),
+        )
+        self.errors = ErrorDict()
+
+    def non_field_errors(self):
+        return ErrorList()
+
+    def is_multipart(self):
+        return False
+
+
+class ViewOnlyInlineFormSet(object):
+    """
+    Stand-in for the formset of a view only inline. It holds the related
+    objects only, without building a form per object or a management form.
+    The subclasses define the ``model`` and the ``fk`` to the parent model.
+    If ``per_page`` is set, the objects are paginated by primary key with
+    the ``<prefix>-after`` and ``<prefix>-before`` parameters of ``params``
+    """
+    model = None
+    fk = None
+    select_related = ()
+    prefetch_related = ()
+    per_page = None
+    params = None
+    is_bound = False
+    media = forms.Media()
+
+    def __init__(self, instance=None, prefix=None, queryset=None, **kwargs):
+        self.instance = instance
+        self.prefix = prefix or self.get_default_prefix()
+        if instance is None or instance.pk is None:
+            self.queryset = self.model._default_manager.none()
+        else:
+            self.queryset = queryset.filter(**{self.fk.name: instance})
+            # Same order as the formset, which orders unordered querysets by
+            # primary key
+            if not self.queryset.ordered:
+                self.queryset = self.queryset.order_by(
+                    self.model._meta.pk.name)
+            if self.select_related:
+                self.queryset = self.queryset.select_related(
+                    *self.select_related)
+            if self.prefetch_related:
+                self.queryset = self.queryset.prefetch_related(
+                    *self.prefetch_related)
+        self.errors = []
+
+        if self.params is None:
+            self.params = QueryDict()
+        self.objects = self.queryset
+        self.previous_url = self.next_url = None
+        if self.per_page:
+            self.paginate()
+
+    def get_cursor(self, name):
+        try:
+            return self.model._meta.pk.to_python(
+                self.params['%s-%s' % (self.prefix, name)])
+        except (KeyError, ValidationError):
+            return None
+
+    def get_page_url(self, name, pk):
+        params = self.params.copy()
+        params.pop('%s-after' % self.prefix, None)
+        params.pop('%s-before' % self.prefix, None)
+        params['%s-%s' % (self.prefix, name)] = force_text(pk)
+        return '?%s' % params.urlencode()
+
+    def paginate(self):
+        """
+        Fetch one page of objects ordered by primary key. Fetching one more
+        object than the page size tells if there is a following page, so the
+        objects are never counted
+        """
+        before = self.get_cursor('before')
+        after = self.get_cursor('after')
+        if before is not None:
+            objects = list(self.queryset.filter(pk__lt=before).order_by(
+                '-pk')[:self.per_page + 1])
+            has_previous = len(objects) > self.per_page
+            has_next = True
+            objects = objects[:self.per_page][::-1]
+        else:
+            queryset = self.queryset.order_by('pk')
+            if after is not None:
+                queryset = queryset.filter(pk__gt=after)
+            objects = list(queryset[:self.per_page + 1])
+            has_previous = after is not None
+            has_next = len(objects) > self.per_page
+            objects = objects[:self.per_page]
+
+        self.objects = objects
+        if objects:
+            if has_previous:
+                self.previous_url = self.get_page_url(
+                    'before', objects[0].pk)
+            if has_next:
+                self.next_url = self.get_page_url('after', objects[-1].pk)
+
+    @classmethod
+    def get_default_prefix(cls):
+        remote_field = getattr(cls.fk, 'remote_field', None) or cls.fk.rel
+        return remote_field.get_accessor_name(model=cls.model).replace(
+            '+', '')
+
+    def non_form_errors(self):
+        return ErrorList()
+
+    def is_multipart(self):
+        return False
+
+
+class ViewOnlyInlineOptions(object):
+    """
+    Expose the options of the inline with the template of the view only
+    inline
+    """
+
+    def __init__(self, inline, template):
+        self.inline = inline
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.inline, name)
+
+
+class ViewOnlyInlineAdminFormSet(object):
+    """
+    A read-only counterpart of InlineAdminFormSet, which renders the related
+    objects of a ViewOnlyInlineFormSet
+    """
+
+    def __init__(self, inline, formset, fieldsets, readonly_fields=None,
+                 model_admin=None):
+        self.opts = ViewOnlyInlineOptions(
+            inline, VIEW_ONLY_INLINE_TEMPLATES[inline.template])
+        self.formset = formset
+        self.fieldsets = fieldsets
+        self.readonly_fields = readonly_fields or ()
+        self.model_admin = model_admin
+        self.help_icon = HELP_ICON
+        # The classes of the inlines are new in django 1.10
+        classes = getattr(inline, 'classes', None)
+        self.classes = ' '.join(classes) if classes else ''
+
+    def __iter__(self):
+        for obj in self.formset.objects:
+            yield ViewOnlyInlineAdminForm(self, obj)
+
+    def fields(self):
+        meta = getattr(self.opts.form, '_meta', None)
+        meta_labels = getattr(meta, 'labels', None) or {}
+        meta_help_texts = getattr(meta, 'help_texts', None) or {}
+        for field_name in flatten_fieldsets(self.fieldsets):
+            if field_name == self.formset.fk.name:
+                continue
+            yield {
+                'label': meta_labels.get(field_name) or label_for_field(
+                    field_name, self.opts.model, self.opts.inline),
+                'widget': {'is_hidden': False},
+                'required': False,
+                'help_text': meta_help_texts.get(field_name) or
+                help_text_for_field(field_name, self.opts.model),
+            }
+
+    @property
+    def media(self):
+        media = self.opts.media
+        for name, options in self.fieldsets:
+            media = media + helpers.Fieldset(None, name, **options).media
+        return media
+
+
+class ViewOnlyInlineAdminForm(object):
+    """
+    A read-only counterpart of InlineAdminForm for one related object
+    """
+
+    def __init__(self, inline_admin_formset, original):
+        inline = inline_admin_formset.opts.inline
+        self.inline_admin_formset = inline_admin_formset
+        self.original = original
+        self.model_admin = inline
+        self.form = ViewOnlyForm(original, inline.form)
+        view_on_site_url = inline.get_view_on_site_url(original)
+        self.show_url = view_on_site_url is not None
+        self.absolute_url = view_on_site_url
+
+    def __iter__(self):
+        inline_admin_formset = self.inline_admin_formset
+        for name, options in inline_admin_formset.fieldsets:
+            yield helpers.InlineFieldset(
+                inline_admin_formset.formset, self.form, name,
+                inline_admin_formset.readonly_fields,
+                model_admin=self.model_admin, **options)
@@ -0,0 +1,237 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import time
+from multiprocessing import Pool
+
+import django
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.http import HttpRequest
+from django.utils.encoding import force_bytes
+from django.utils.module_loading import import_string
+
+from admin_view_permission.actions import EXPORT_FORMATS, get_export_rows
+
+
+def get_model_admin(site_path, label):
+    """
+    Return the model admin of the model with the given label (app_label.Model)
+    on the given admin site
+    """
+    try:
+        model = apps.get_model(label)
+    except (LookupError, ValueError) as e:
+        raise CommandError(str(e))
+
+    try:
+        site = import_string(site_path)
+    except ImportError as e:
+        raise CommandError(str(e))
+
+    try:
+        modeladmin = site._registry[model]
+    except KeyError:
+        raise CommandError('The model {} is not registered on {}'.format(
+            label, site_path))
+
+    if not hasattr(modeladmin, 'get_view_only_export_fields'):
+        raise CommandError(
+            'The admin of the model {} does not support the view only '
+            'export'.format(label))
+
+    return modeladmin
+
+
+def get_request(username):
+    """
+    Return a request of the given user, which the model admin uses to build
+    its queryset and its field layout
+    """
+    User = get_user_model()
+    try:
+        user = User._default_manager.get_by_natural_key(username)
+    except User.DoesNotExist:
+        raise CommandError('Unknown user {}'.format(username))
+
+    request = HttpRequest()
+    request.method = 'GET'
+    request.user = user
+    return request
+
+
+def close_connections():
+    for connection in connections.all():
+        connection.close()
+
+
+def init_worker():
+    # Every worker opens its own connections, the inherited ones are shared
+    # with the parent process
+    if not apps.ready:
+        django.setup()
+    close_connections()
+
+
+def export_range(task):
+    """
+    Export the objects whose primary key is in the range [start, end) to the
+    given path, the range of the last objects has no end. Returns the number
+    of exported rows
+    """
+    site_path, label, username, export_format, start, end, path = task
+    modeladmin = get_model_admin(site_path, label)
+    request = get_request(username)
+
+    queryset = modeladmin.get_queryset(request).order_by('pk')
+    queryset = queryset.filter(pk__gte=start)
+    if end is not None:
+        queryset = queryset.filter(pk__lt=end)
+
+    get_lines, content_type = EXPORT_FORMATS[export_format]
+    fields, rows = get_export_rows(modeladmin, request, queryset)
+    count = [0]
+
+    def count_rows():
+        for row in rows:
+            count[0] += 1
+            yield row
+
+    with open(path, 'wb') as f:
+        for line in get_lines(fields, count_rows(), header=False):
+            f.write(force_bytes(line))
+
+    return count[0]
+
+
+class Command(BaseCommand):
+    """
+    Export the objects of a model as they are shown to the users with view
+    only permission: the queryset of the model admin and the fields of the
+    view only layout. The objects are split into primary key ranges, which
+    are exported in parallel by a pool of processes.
+    """
+    help = "Export the objects of a model admin to a CSV or a JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model', help='The model to export, as app_label.ModelName.',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='The file to write the objects to. Required.',
+        )
+        parser.add_argument(
+            '--format', choices=list(EXPORT_FORMATS), default='csv',
+            dest='export_format', help='The format of the file.',
+        )
+        parser.add_argument(
+            '--user',
+            help='The username of the user whose view of the objects is '
+                 'exported. Required.',
+        )
+        parser.add_argument(
+            '--admin-site', default='django.contrib.admin.site',
+            dest='admin_site',
+            help='The dotted path of the admin site. Defaults to '
+                 '"django.contrib.admin.site".',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='The number of processes which export the primary key '
+                 'ranges. Defaults to 1, which exports in this process.',
+        )
+        parser.add_argument(
+            '--range-size', type=int, default=100000, dest='range_size',
+            help='The number of objects of every range.',
+        )
+
+    def handle(self, *args, **options):
+        label = options['model']
+        export_format = options['export_format']
+        workers = options['workers']
+        range_size = options['range_size']
+        # The options are validated here, call_command of older django
+        # versions doesn't pass the required options to the parser
+        if not options.get('output') or not options.get('user'):
+            raise CommandError('The --output and --user options are required')
+        if workers < 1 or range_size < 1:
+            raise CommandError(
+                'The workers and the range size must be positive')
+
+        modeladmin = get_model_admin(options['admin_site'], label)
+        request = get_request(options['user'])
+        if not modeladmin.has_view_permission(request):
+            raise CommandError('The user {} cannot view the model {}'.format(
+                options['user'], label))
+
+        start_time = time.time()
+        output = options['output']
+        ranges = self.get_ranges(
+            modeladmin.get_queryset(request), range_size)
+        tmp_dir = tempfile.mkdtemp(
+            dir=os.path.dirname(os.path.abspath(output)))
+        try:
+            tasks = [
+                (options['admin_site'], label, options['user'],
+                 export_format, start, end,
+                 os.path.join(tmp_dir, '{}.part'.format(index)))
+                for index, (start, end) in enumerate(ranges)
+            ]
+            counts = self.run(tasks, workers)
+
+            with open(output, 'wb') as f:
+                get_lines, content_type = EXPORT_FORMATS[export_format]
+                fields = modeladmin.get_view_only_export_fields(request)
+                for line in get_lines(fields, []):
+                    f.write(force_bytes(line))
+                for task in tasks:
+                    with open(task[-1], 'rb') as part:
+                        shutil.copyfileobj(part, f)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        duration = time.time() - start_time
+        rows = sum(counts)
+        self.stdout.write(
+            'Exported {} rows in {} ranges in {:.3f}s ({:.0f} rows/s)\n'
+            .format(rows, len(ranges), duration,
+                    rows / duration if duration else rows))
+
+    def get_ranges(self, queryset, range_size):
+        """
+        Split the objects of the queryset into ranges [start, end) of
+        range_size objects, by their primary key. The first key of every
+        range is read from the index of the primary key, so the ranges
+        follow the existing keys whatever their gaps
+        """
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        starts = list(pks[:1])
+        while starts:
+            start = list(pks.filter(pk__gt=starts[-1])[
+                range_size - 1:range_size])
+            if not start:
+                break
+            starts.extend(start)
+
+        return list(zip(starts, starts[1:] + [None]))
+
+    def run(self, tasks, workers):
+        """
+        Export the ranges and return the number of rows of every range
+        """
+        if workers == 1 or len(tasks) <= 1:
+            return [export_range(task) for task in tasks]
+
+        # The workers must not share the connections of this process
+        close_connections()
+        pool = Pool(min(workers, len(tasks)), initializer=init_worker)
+        try:
+            return pool.map(export_range, tasks)
+        finally:
+            pool.close()
+            pool.join()
@@ -1,13 +1,18 @@
-import copy
+import time
+from collections import OrderedDict, defaultdict, namedtuple
+from multiprocessing.pool import ThreadPool
 
 from django.apps import apps
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
 
 from admin_view_permission.apps import update_permissions
 from admin_view_permission.utils import get_all_permissions
 
+Plan = namedtuple('Plan', 'content_types, permissions, parent_permissions')
+
 
 class Command(BaseCommand):
     """
@@ -20,7 +25,33 @@ class Command(BaseCommand):
     """
     help = "Fix permissions for proxy models."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'app_label', nargs='*',
+            help='Fix only the proxy models of the given app labels.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true', dest='dry_run', default=False,
+            help='Print the content types and the permissions which would '
+                 'be created or deleted, without changing the database.',
+        )
+        parser.add_argument(
+            '--database', action='append', dest='databases',
+            help='Nominates a database to fix. Can be used more than once. '
+                 'Defaults to the "default" database.',
+        )
+        parser.add_argument(
+            '--all-databases', action='store_true', dest='all_databases',
+            default=False,
+            help='Fix every database which the permissions are migrated to.',
+        )
+
     def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        verbosity = options.get('verbosity', 1)
+        databases = self.get_databases(
+            options.get('databases'), options.get('all_databases'))
+
         # We need to execute the post migration callback manually in order
         # to append the view permission on the proxy model. Then the following
         # script will create the appropriate content type and move the
@@ -31,37 +62,196 @@ class Command(BaseCommand):
             apps.get_app_config('admin_view_permission'),
             verbosity=1,
             interactive=True,
-            using='default',
+            using=databases[0],
         )
 
-        for model in apps.get_models():
-            opts = model._meta
-            ctype, created = ContentType.objects.get_or_create(
-                app_label=opts.app_label,
-                model=opts.object_name.lower(),
-            )
+        models = self.get_proxy_models(options['app_label'])
+        if len(databases) == 1:
+            results = [self.fix_database(databases[0], models, dry_run)]
+        else:
+            # Every thread uses its own connection to its database
+            pool = ThreadPool(len(databases))
+            try:
+                results = pool.map(
+                    lambda using: self.fix_database(
+                        using, models, dry_run, close_connection=True),
+                    databases)
+            finally:
+                pool.close()
+                pool.join()
+
+        for using, plan, duration in results:
+            if dry_run:
+                self.print_plan(plan)
+            else:
+                self.write_plan(plan)
+
+        if len(databases) > 1 or verbosity >= 2:
+            for using, plan, duration in results:
+                self.stdout.write(
+                    'Database {}: {} permissions to create, {} permissions '
+                    'to delete in {:.3f}s\n'.format(
+                        using, len(plan.permissions),
+                        len(plan.parent_permissions), duration))
+
+    def get_databases(self, databases, all_databases):
+        if all_databases:
+            return [
+                using for using in connections
+                if router.allow_migrate_model(using, Permission)
+            ]
+
+        databases = databases or [DEFAULT_DB_ALIAS]
+        for using in databases:
+            if using not in connections.databases:
+                raise CommandError('Unknown database {}'.format(using))
+
+        # Remove duplicates whilst preserving order
+        return list(OrderedDict.fromkeys(databases))
+
+    def fix_database(self, using, models, dry_run, close_connection=False):
+        """
+        Compute the plan of the given database and apply it unless dry_run is
+        set. Returns the database, the plan and the duration in seconds
+        """
+        start = time.time()
+        try:
+            if dry_run:
+                plan = self.get_plan(models, using, dry_run=True)
+            else:
+                with transaction.atomic(using=using):
+                    plan = self.get_plan(models, using)
+                    self.apply_plan(plan, using)
+        finally:
+            if close_connection:
+                connections[using].close()
+
+        return using, plan, time.time() - start
+
+    def get_proxy_models(self, app_labels):
+        """
+        Return the proxy models of the given apps or of every app. Only the
+        proxy models are affected by the bug.
+        """
+        if app_labels:
+            try:
+                app_configs = [
+                    apps.get_app_config(app_label) for app_label in app_labels
+                ]
+            except LookupError as e:
+                raise CommandError(str(e))
+        else:
+            app_configs = apps.get_app_configs()
 
+        return [
+            model
+            for app_config in app_configs
+            for model in app_config.get_models()
+            if model._meta.proxy
+        ]
+
+    def get_plan(self, models, using, dry_run=False):
+        """
+        Return the missing content types and permissions of the given models
+        and the permissions with the same codename which are attached to a
+        model of another app (the parent model of a proxy)
+        """
+        ctypes, new_ctypes = self.get_content_types(
+            models, using, create=not dry_run)
+
+        existing_perms = set()
+        perms_by_codename = defaultdict(list)
+        for perm_id, codename, ctype_id, app_label in Permission.objects.using(
+                using).values_list('pk', 'codename', 'content_type_id',
+                                   'content_type__app_label'):
+            existing_perms.add((ctype_id, codename))
+            perms_by_codename[codename].append((perm_id, app_label))
+
+        perms = []
+        parent_perm_ids = set()
+        for model in models:
+            opts = model._meta
+            ctype = ctypes[(opts.app_label, opts.object_name.lower())]
             for codename, name in get_all_permissions(opts, ctype):
-                perm, created = Permission.objects.get_or_create(
-                    codename=codename,
-                    content_type=ctype,
-                    defaults={'name': name},
+                if (ctype.pk, codename) in existing_perms:
+                    continue
+
+                perms.append(Permission(
+                    codename=codename, name=name, content_type=ctype))
+                parent_perm_ids.update(
+                    perm_id
+                    for perm_id, app_label in perms_by_codename[codename]
+                    if app_label != ctype.app_label
                 )
-                if created:
-                    self.delete_parent_perms(perm)
-                    self.stdout.write('Adding permission {}\n'.format(perm))
-
-    def delete_parent_perms(self, perm):
-        # Try to delete the permission attached to the parent model
-        # if exists
-        parent_perms = Permission.objects.filter(
-            codename=perm.codename,
-        ).exclude(
-            content_type__app_label=perm.content_type.app_label,
+
+        parent_perms = []
+        if parent_perm_ids:
+            parent_perms = list(Permission.objects.using(using).filter(
+                pk__in=parent_perm_ids).select_related('content_type'))
+
+        return Plan(new_ctypes, perms, parent_perms)
+
+    def get_content_types(self, models, using, create=True):
+        """
+        Return the content types of the given models keyed by app_label and
+        model and the missing ones, which are created unless create is False
+        """
+        keys = set(
+            (model._meta.app_label, model._meta.object_name.lower())
+            for model in models
+        )
+        ctypes = dict(
+            ((ctype.app_label, ctype.model), ctype)
+            for ctype in ContentType.objects.using(using).all()
         )
 
-        if parent_perms.exists():
-            copied_parent_perms = list(copy.deepcopy(parent_perms))
-            parent_perms.delete()
-            for parent_perm in copied_parent_perms:
-                self.stdout.write('Delete permission {}\n'.format(parent_perm))
+        new_ctypes = [
+            ContentType(app_label=app_label, model=model)
+            for app_label, model in sorted(keys.difference(ctypes))
+        ]
+        if new_ctypes and create:
+            ContentType.objects.using(using).bulk_create(new_ctypes)
+            # bulk_create doesn't set the primary keys on every backend
+            ctypes = dict(
+                ((ctype.app_label, ctype.model), ctype)
+                for ctype in ContentType.objects.using(using).all()
+            )
+            ContentType.objects.clear_cache()
+        else:
+            ctypes.update(
+                ((ctype.app_label, ctype.model), ctype)
+                for ctype in new_ctypes
+            )
+
+        return ctypes, new_ctypes
+
+    def apply_plan(self, plan, using):
+        # Delete the permissions attached to the parent models
+        if plan.parent_permissions:
+            Permission.objects.using(using).filter(
+                pk__in=[perm.pk for perm in plan.parent_permissions]
+            ).delete()
+
+        Permission.objects.using(using).bulk_create(plan.permissions)
+
+    def write_plan(self, plan):
+        for parent_perm in plan.parent_permissions:
+            self.stdout.write('Delete permission {}\n'.format(parent_perm))
+        for perm in plan.permissions:
+            self.stdout.write('Adding permission {}\n'.format(perm))
+
+    def print_plan(self, plan):
+        for ctype in plan.content_types:
+            self.stdout.write('Would create content type {}.{}\n'.format(
+                ctype.app_label, ctype.model))
+        for parent_perm in plan.parent_permissions:
+            self.stdout.write('Would delete permission {}\n'.format(
+                parent_perm))
+        for perm in plan.permissions:
+            self.stdout.write('Would add permission {}\n'.format(perm))
+
+        self.stdout.write(
+            'Plan: {} content types to create, {} permissions to create, '
+            '{} permissions to delete\n'.format(
+                len(plan.content_types), len(plan.permissions),
+                len(plan.parent_permissions)))
@@ -0,0 +1,148 @@
+from __future__ import unicode_literals
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin.options import BaseModelAdmin, InlineModelAdmin
+from django.contrib.auth import get_permission_codename
+from django.utils.module_loading import import_string
+
+from .cache import get_permission_cache
+
+ACTIONS = ('add', 'change', 'delete', 'view')
+
+_permission_index = None
+_model_backends = {}
+
+
+def get_function(method):
+    # Unbound methods on python 2, bound methods and functions on python 3
+    return getattr(method, '__func__', method)
+
+
+# The permission methods of the django admin, which are equivalent to a
+# user.has_perm call with the permission of the model
+ADMIN_PERMISSION_METHODS = {
+    action: set(
+        get_function(getattr(cls, 'has_%s_permission' % action))
+        for cls in (BaseModelAdmin, InlineModelAdmin)
+    )
+    for action in ('add', 'change', 'delete')
+}
+
+
+class PermissionIndex(object):
+    """
+    Assign a bit to every add, change, delete and view permission of the
+    given models. The permissions of a user are stored in a single integer,
+    so a permission lookup is a bit test instead of the formatting of a
+    "app_label.codename" string and a set lookup
+    """
+
+    def __init__(self, models):
+        self.bits = {}
+        self.masks = {}
+        for model in models:
+            opts = model._meta
+            for action in ACTIONS:
+                perm = '%s.%s' % (
+                    opts.app_label, get_permission_codename(action, opts))
+                bit = self.bits.setdefault(perm, len(self.bits))
+                self.masks[(model, action)] = 1 << bit
+
+    def get_mask(self, model, action):
+        return self.masks.get((model, action))
+
+    def get_bitset(self, perms):
+        bitset = 0
+        for perm in perms:
+            bit = self.bits.get(perm)
+            if bit is not None:
+                bitset |= 1 << bit
+
+        return bitset
+
+
+def is_admin_permission_method(method, action):
+    """
+    Return True if the given permission method is the one of the django admin
+    """
+    return get_function(method) in ADMIN_PERMISSION_METHODS[action]
+
+
+def get_permission_index():
+    """
+    Return the permission index of the installed models. Models created
+    after the index (eg. at runtime) aren't indexed
+    """
+    global _permission_index
+
+    if _permission_index is None:
+        _permission_index = PermissionIndex(apps.get_models())
+
+    return _permission_index
+
+
+def _uses_model_backends():
+    """
+    Return True if every authentication backend resolves has_perm with a
+    lookup on the permission set of the user, like the ModelBackend
+    """
+    from django.contrib.auth.backends import ModelBackend
+
+    backends = tuple(settings.AUTHENTICATION_BACKENDS)
+    try:
+        return _model_backends[backends]
+    except KeyError:
+        pass
+
+    uses_model_backends = True
+    for backend_path in backends:
+        backend = import_string(backend_path)
+        if not issubclass(backend, ModelBackend) or \
+                get_function(backend.has_perm) is not \
+                get_function(ModelBackend.has_perm):
+            uses_model_backends = False
+            break
+
+    _model_backends[backends] = uses_model_backends
+    return uses_model_backends
+
+
+def can_use_permission_index(user):
+    """
+    Return True if the has_perm of the user is resolved by the backends
+    """
+    from django.contrib.auth.models import AnonymousUser, PermissionsMixin
+
+    has_perm = get_function(getattr(user, 'has_perm', None))
+    return (
+        has_perm in (get_function(PermissionsMixin.has_perm),
+                     get_function(AnonymousUser.has_perm)) and
+        _uses_model_backends()
+    )
+
+
+def has_indexed_permission(request, model, action):
+    """
+    Return whether the request user has the permission of the given action
+    on the model, or None when the permission index can't answer
+    """
+    user = request.user
+    if not can_use_permission_index(user):
+        return None
+
+    # Active superusers have all permissions
+    if user.is_active and user.is_superuser:
+        return True
+
+    index = get_permission_index()
+    mask = index.get_mask(model, action)
+    if mask is None:
+        return None
+
+    cache = get_permission_cache(request)
+    if cache.permission_bitset is None:
+        cache.permission_bitset = index.get_bitset(
+            user.get_all_permissions())
+
+    return bool(cache.permission_bitset & mask)
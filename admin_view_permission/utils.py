@@ -5,31 +5,44 @@ from django.contrib.auth.management import _get_all_permissions
 
 from .enums import DjangoVersion
 
+DJANGO_VERSIONS = (
+    ('1.8', DjangoVersion.DJANGO_18),
+    ('1.9', DjangoVersion.DJANGO_19),
+    ('1.10', DjangoVersion.DJANGO_110),
+    ('1.11', DjangoVersion.DJANGO_111),
+    ('2.0', DjangoVersion.DJANGO_20),
+    ('2.1', DjangoVersion.DJANGO_21),
+)
+
 
 def django_version():
-    if django.get_version().startswith('1.8'):
-        return DjangoVersion.DJANGO_18
-    elif django.get_version().startswith('1.9'):
-        return DjangoVersion.DJANGO_19
-    elif django.get_version().startswith('1.10'):
-        return DjangoVersion.DJANGO_110
-    elif django.get_version().startswith('1.11'):
-        return DjangoVersion.DJANGO_111
-    elif django.get_version().startswith('2.0'):
-        return DjangoVersion.DJANGO_20
-    elif django.get_version().startswith('2.1'):
-        return DjangoVersion.DJANGO_21
+    version = django.get_version()
+    for prefix, value in DJANGO_VERSIONS:
+        if version.startswith(prefix):
+            return value
+
+
+# The version doesn't change while the process runs, so resolve it only once
+DJANGO_VERSION = django_version()
 
 
 def get_model_name(model):
-    if django_version() == DjangoVersion.DJANGO_18:
+    if DJANGO_VERSION == DjangoVersion.DJANGO_18:
         return '%s.%s' % (model._meta.app_label, model._meta.object_name)
 
     return model._meta.label
 
 
+def is_anonymous(user):
+    # is_anonymous is a method before django 1.10
+    if DJANGO_VERSION < DjangoVersion.DJANGO_110:
+        return user.is_anonymous()
+
+    return user.is_anonymous
+
+
 def get_all_permissions(opts, ctype=None):
-    if django_version() < DjangoVersion.DJANGO_110:
+    if DJANGO_VERSION < DjangoVersion.DJANGO_110:
         return _get_all_permissions(opts, ctype)
 
     return _get_all_permissions(opts)
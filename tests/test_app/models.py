@@ -74,3 +74,10 @@ class TestModelParler(TranslatableModel):
     @property
     def var6(self):
         return 'readonly_field'
+
+
+# Inline model with relations to exam the readonly relation fields
+class TestModel7(models.Model):
+    var1 = models.ForeignKey(TestModel1, on_delete=models.CASCADE)
+    var2 = models.ForeignKey(TestModel0, on_delete=models.CASCADE)
+    var3 = models.ManyToManyField(TestModel0, related_name='+')
@@ -0,0 +1,137 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+
+from django.contrib import admin
+from django.contrib.auth.models import Permission
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils.six import StringIO
+from model_mommy import mommy
+
+from admin_view_permission.management.commands.export_admin_queryset import (
+    init_worker,
+)
+from tests.test_app.models import TestModel1
+from tests.tests.helpers import create_simple_user
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class ExportMixin(object):
+
+    def setUp(self):
+        super(ExportMixin, self).setUp()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp_dir, 'export')
+        self.user = create_simple_user()
+        self.user.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel1'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        super(ExportMixin, self).tearDown()
+
+    def export(self, *args, **kwargs):
+        stdout = StringIO()
+        kwargs.setdefault('user', self.user.username)
+        call_command('export_admin_queryset', 'test_app.TestModel1',
+                     output=self.output, stdout=stdout, *args, **kwargs)
+        with io.open(self.output, encoding='utf-8') as f:
+            return f.read().splitlines(), stdout.getvalue()
+
+
+class TestExportAdminQueryset(ExportMixin, TestCase):
+
+    def test_export_csv(self):
+        objs = [
+            mommy.make('test_app.TestModel1', var1='a', var2='b', var3=i)
+            for i in range(5)
+        ]
+
+        lines, stdout = self.export(range_size=2)
+
+        assert lines == ['id,var1,var2,var3'] + [
+            '%s,a,b,%s' % (obj.pk, obj.var3) for obj in objs
+        ]
+        assert 'Exported 5 rows in 3 ranges' in stdout
+        assert 'rows/s' in stdout
+        assert os.listdir(self.tmp_dir) == ['export']
+
+    def test_export_jsonl(self):
+        obj = mommy.make('test_app.TestModel1', var1='a', var2='b', var3=1)
+
+        lines, stdout = self.export(export_format='jsonl')
+
+        assert [json.loads(line) for line in lines] == [
+            {'id': obj.pk, 'var1': 'a', 'var2': 'b', 'var3': 1},
+        ]
+
+    def test_export_fieldsets(self):
+        obj = mommy.make('test_app.TestModel1', var1='a', var2='b', var3=1)
+        modeladmin = admin.site._registry[TestModel1]
+
+        with patch.object(modeladmin, 'fieldsets',
+                          [(None, {'fields': ['var1']})]):
+            lines, stdout = self.export()
+
+        assert lines == ['id,var1', '%s,a' % obj.pk]
+
+    def test_export_sparse_primary_keys(self):
+        for pk in (1, 2, 10 ** 9, 10 ** 9 + 1, 10 ** 12):
+            mommy.make('test_app.TestModel1', pk=pk, var1='a', var2='b',
+                       var3=1)
+
+        lines, stdout = self.export(range_size=2)
+
+        assert [int(line.split(',')[0]) for line in lines[1:]] == [
+            1, 2, 10 ** 9, 10 ** 9 + 1, 10 ** 12]
+        assert 'Exported 5 rows in 3 ranges' in stdout
+
+    def test_export_empty_queryset(self):
+        lines, stdout = self.export()
+
+        assert lines == ['id,var1,var2,var3']
+        assert 'Exported 0 rows in 0 ranges' in stdout
+
+    def test_export_without_view_permission(self):
+        user = create_simple_user()
+
+        with self.assertRaises(CommandError):
+            self.export(user=user.username)
+
+    def test_export_unknown_user(self):
+        with self.assertRaises(CommandError):
+            self.export(user='unknown')
+
+    def test_export_unknown_model(self):
+        with self.assertRaises(CommandError):
+            call_command('export_admin_queryset', 'test_app.Unknown',
+                         output=self.output, user=self.user.username)
+
+
+class TestExportAdminQuerysetWorkers(ExportMixin, TransactionTestCase):
+
+    def test_export_with_workers(self):
+        pks = [
+            obj.pk for obj in mommy.make('test_app.TestModel1', _quantity=7)
+        ]
+
+        # The test database is a file, so the ranges are exported by worker
+        # processes with their own connections
+        with patch('admin_view_permission.management.commands.'
+                   'export_admin_queryset.Pool', wraps=Pool) as pool:
+            lines, stdout = self.export(workers=3, range_size=2)
+
+        pool.assert_called_once_with(3, initializer=init_worker)
+        assert [int(line.split(',')[0]) for line in lines[1:]] == pks
+        assert 'Exported 7 rows in 4 ranges' in stdout
+        assert TestModel1.objects.count() == 7
@@ -3,8 +3,11 @@ from __future__ import unicode_literals
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
-from django.core.management import call_command
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.six import StringIO
 
 User = get_user_model()
 
@@ -55,3 +58,134 @@ class TestFixProxyPermission(TestCase):
 
         assert ctypes.count() == 1
         assert permissions.count() == 4
+
+    def test_fix_proxy_permissions_deletes_parent_permissions(self):
+        ctype = ContentType.objects.get_for_model(User)
+        Permission.objects.create(
+            codename='view_apptestproxymodel',
+            name='Can view apptestproxymodel',
+            content_type=ctype,
+        )
+        stdout = StringIO()
+        call_command('fix_proxy_permissions', stdout=stdout)
+        permissions = Permission.objects.filter(
+            codename__contains='apptestproxymodel')
+
+        assert permissions.count() == 4
+        assert not permissions.filter(content_type=ctype).exists()
+        assert 'Delete permission auth | user | Can view ' \
+            'apptestproxymodel' in stdout.getvalue()
+        assert stdout.getvalue().count('Adding permission') == 4
+
+    def test_fix_proxy_permissions_is_idempotent(self):
+        call_command('fix_proxy_permissions', stdout=StringIO())
+        stdout = StringIO()
+        call_command('fix_proxy_permissions', stdout=stdout)
+
+        assert stdout.getvalue() == ''
+
+    def test_fix_proxy_permissions_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            call_command('fix_proxy_permissions', stdout=StringIO())
+
+        # Loading and creating the content types and the permissions
+        # doesn't depend on the number of the models
+        assert len([query for query in queries.captured_queries
+                    if 'SAVEPOINT' not in query['sql']]) <= 5
+
+    def test_fix_proxy_permissions_skips_concrete_models(self):
+        Permission.objects.filter(codename='add_testmodel1').delete()
+        call_command('fix_proxy_permissions', stdout=StringIO())
+
+        assert not Permission.objects.filter(
+            codename='add_testmodel1').exists()
+
+    def test_fix_proxy_permissions_with_app_label(self):
+        call_command('fix_proxy_permissions', 'auth', stdout=StringIO())
+        permissions = Permission.objects.filter(
+            codename__contains='apptestproxymodel')
+
+        assert permissions.count() == 0
+
+        call_command('fix_proxy_permissions', 'test_app', stdout=StringIO())
+
+        assert permissions.count() == 4
+
+    def test_fix_proxy_permissions_with_unknown_app_label(self):
+        with self.assertRaises(CommandError):
+            call_command('fix_proxy_permissions', 'unknown_app')
+
+    def test_fix_proxy_permissions_dry_run(self):
+        ctype = ContentType.objects.get_for_model(User)
+        Permission.objects.create(
+            codename='view_apptestproxymodel',
+            name='Can view apptestproxymodel',
+            content_type=ctype,
+        )
+        stdout = StringIO()
+        call_command('fix_proxy_permissions', dry_run=True, stdout=stdout)
+        output = stdout.getvalue()
+
+        assert not ContentType.objects.filter(
+            model='apptestproxymodel').exists()
+        assert Permission.objects.filter(
+            codename__contains='apptestproxymodel').count() == 1
+        assert 'Would create content type test_app.apptestproxymodel' in \
+            output
+        assert 'Would delete permission auth | user | Can view ' \
+            'apptestproxymodel' in output
+        assert output.count('Would add permission') == 4
+        assert 'Plan: 1 content types to create, 4 permissions to create, ' \
+            '1 permissions to delete' in output
+
+
+class TestFixProxyPermissionMultiDatabase(TransactionTestCase):
+    multi_db = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestFixProxyPermissionMultiDatabase, cls).setUpClass()
+
+        class Meta:
+            proxy = True
+
+        attrs = {
+            '__module__': 'tests.test_app.models',
+            'Meta': Meta,
+        }
+
+        cls.proxy_model = type(str('AppTestMultiDbProxyModel'), (User, ),
+                               attrs.copy())
+
+    def get_permissions(self, using):
+        return Permission.objects.using(using).filter(
+            codename__contains='apptestmultidbproxymodel',
+            content_type__app_label='test_app')
+
+    def test_fix_proxy_permissions_default_database(self):
+        call_command('fix_proxy_permissions', stdout=StringIO())
+
+        assert self.get_permissions('default').count() == 4
+        assert self.get_permissions('other').count() == 0
+
+    def test_fix_proxy_permissions_with_database(self):
+        call_command('fix_proxy_permissions', database=['other'],
+                     stdout=StringIO())
+
+        assert self.get_permissions('default').count() == 0
+        assert self.get_permissions('other').count() == 4
+
+    def test_fix_proxy_permissions_with_all_databases(self):
+        stdout = StringIO()
+        call_command('fix_proxy_permissions', all_databases=True,
+                     stdout=stdout)
+        output = stdout.getvalue()
+
+        assert self.get_permissions('default').count() == 4
+        assert self.get_permissions('other').count() == 4
+        assert output.count('Database default: ') == 1
+        assert output.count('Database other: ') == 1
+
+    def test_fix_proxy_permissions_with_unknown_database(self):
+        with self.assertRaises(CommandError):
+            call_command('fix_proxy_permissions', database=['unknown'])
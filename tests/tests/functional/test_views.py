@@ -1,11 +1,31 @@
 from __future__ import unicode_literals
 
+import re
+from datetime import datetime
+
+import pytest
 from bs4 import BeautifulSoup
-from django import VERSION
+from django import VERSION, forms
 from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.contrib.staticfiles import finders
+from django.db import connection
+from django.forms.models import inlineformset_factory, modelform_factory
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from model_mommy import mommy
 
+from admin_view_permission.actions import export_as_csv
+from admin_view_permission.enums import ChangeListPagination
+from admin_view_permission.helpers import HELP_ICON
+from tests.test_app.models import (
+    TestModel1,
+    TestModel2,
+    TestModel3,
+    TestModel7,
+)
 from tests.tests.helpers import AdminViewPermissionViewsTestCase
 
 try:
@@ -14,6 +34,17 @@ except ImportError:
     # django < 2.0
     from django.core.urlresolvers import reverse
 
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class DelegatingBackend(ModelBackend):
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return super(DelegatingBackend, self).has_perm(user_obj, perm, obj)
+
 
 class TestModelAdminViews(AdminViewPermissionViewsTestCase):
 
@@ -106,6 +137,217 @@ class TestModelAdminViews(AdminViewPermissionViewsTestCase):
         assert response.status_code == 200
         assert response.context['title'] == 'Select test model1 to change'
 
+    def test_changelist_view_export_action_from_simple_user(self):
+        objs = mommy.make('test_app.TestModel1', _quantity=2)
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(type(model_admin), 'actions', [export_as_csv]):
+            response = self.client.post(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+                {
+                    'action': 'export_as_csv',
+                    '_selected_action': [obj.pk for obj in objs],
+                },
+            )
+
+        assert response.status_code == 200
+        assert response.streaming
+        content = b''.join(response.streaming_content).decode('utf-8')
+        assert len(content.splitlines()) == 3
+
+    def test_changelist_view_countless_from_simple_user(self):
+        mommy.make('test_app.TestModel1', _quantity=5)
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1'))
+        model_admin = admin.site._registry[TestModel1]
+
+        def get_page(params):
+            with patch.object(model_admin, 'view_only_pagination',
+                              ChangeListPagination.COUNTLESS), \
+                    patch.object(model_admin, 'list_per_page', 2), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+
+            assert response.status_code == 200
+            assert not [
+                query for query in queries.captured_queries
+                if 'COUNT(' in query['sql'].upper()
+            ]
+            bs = BeautifulSoup(response.content.decode('utf-8'),
+                               'html.parser')
+            links = dict(
+                (link.text, link['href'])
+                for link in bs.select('.paginator a'))
+            return len(response.context['cl'].result_list), links
+
+        rows, links = get_page({})
+        assert rows == 2
+        assert links == {'Next': '?p=1'}
+
+        rows, links = get_page({'p': 1})
+        assert rows == 2
+        assert links == {'Previous': '?p=0', 'Next': '?p=2'}
+
+        rows, links = get_page({'p': 2})
+        assert rows == 1
+        assert links == {'Previous': '?p=1'}
+
+    def test_changelist_view_countless_out_of_range_page(self):
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_pagination',
+                          ChangeListPagination.COUNTLESS):
+            response = self.client.get(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+                {'p': 3},
+            )
+
+        assert response.status_code == 302
+        assert response['Location'].endswith('?e=1')
+
+    def test_changelist_view_keyset_from_simple_user(self):
+        for var3 in (2, 1, 2, 1, 3):
+            mommy.make('test_app.TestModel1', var3=var3)
+        expected = list(TestModel1.objects.order_by(
+            'var3', '-pk').values_list('pk', flat=True))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1'))
+        model_admin = admin.site._registry[TestModel1]
+
+        def get_page(query_string):
+            with patch.object(model_admin, 'view_only_pagination',
+                              ChangeListPagination.KEYSET), \
+                    patch.object(model_admin, 'list_per_page', 2), \
+                    patch.object(model_admin, 'ordering', ('var3',)), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url + query_string)
+
+            assert response.status_code == 200
+            assert response.context['cl'].pagination == \
+                ChangeListPagination.KEYSET
+            assert not [
+                query for query in queries.captured_queries
+                if 'COUNT(' in query['sql'].upper()
+            ]
+            bs = BeautifulSoup(response.content.decode('utf-8'),
+                               'html.parser')
+            links = dict(
+                (link.text, link['href'])
+                for link in bs.select('.paginator a'))
+            pks = [obj.pk for obj in response.context['cl'].result_list]
+            return pks, links
+
+        pks, links = get_page('')
+        assert pks == expected[:2]
+        assert list(links) == ['Next']
+
+        pks, links = get_page(links['Next'])
+        assert pks == expected[2:4]
+        assert sorted(links) == ['Next', 'Previous']
+        previous_url = links['Previous']
+
+        pks, links = get_page(links['Next'])
+        assert pks == expected[4:]
+        assert list(links) == ['Previous']
+
+        pks, links = get_page(links['Previous'])
+        assert pks == expected[2:4]
+
+        pks, links = get_page(previous_url)
+        assert pks == expected[:2]
+        assert list(links) == ['Next']
+
+    def test_changelist_view_keyset_falls_back_to_countless(self):
+        mommy.make('test_app.TestModel1', _quantity=3)
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_pagination',
+                          ChangeListPagination.KEYSET), \
+                patch.object(model_admin, 'ordering', ('var4',)):
+            response = self.client.get(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+            )
+
+        assert response.status_code == 200
+        assert response.context['cl'].pagination == \
+            ChangeListPagination.COUNTLESS
+
+    def test_changelist_view_keyset_invalid_cursor(self):
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_pagination',
+                          ChangeListPagination.KEYSET):
+            response = self.client.get(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+                {'cursor': 'invalid'},
+            )
+
+        assert response.status_code == 302
+        assert response['Location'].endswith('?e=1')
+
+    def test_changelist_view_cursor_filter_without_keyset(self):
+        class CursorFilter(admin.SimpleListFilter):
+            title = 'cursor'
+            parameter_name = 'cursor'
+
+            def lookups(self, request, model_admin):
+                return [('1', '1'), ('2', '2')]
+
+            def queryset(self, request, queryset):
+                if self.value():
+                    return queryset.filter(var3=self.value())
+
+        obj = mommy.make('test_app.TestModel1', var3=1)
+        mommy.make('test_app.TestModel1', var3=2)
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_pagination',
+                          ChangeListPagination.COUNTLESS), \
+                patch.object(model_admin, 'list_filter', [CursorFilter]):
+            response = self.client.get(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+                {'cursor': '1'},
+            )
+
+        assert response.status_code == 200
+        assert [o.pk for o in response.context['cl'].result_list] == [obj.pk]
+
+    def test_changelist_view_countless_from_super_user(self):
+        mommy.make('test_app.TestModel1', _quantity=3)
+        self.client.login(username='super_user', password='super_user')
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_pagination',
+                          ChangeListPagination.COUNTLESS):
+            response = self.client.get(
+                reverse('admin:%s_%s_changelist' % ('test_app', 'testmodel1')),
+            )
+
+        assert response.status_code == 200
+        assert response.context['cl'].pagination == \
+            ChangeListPagination.OFFSET
+        assert response.context['cl'].result_count == 3
+
     # history
 
     def test_history_view_from_simple_user(self):
@@ -167,6 +409,416 @@ class TestModelAdminViews(AdminViewPermissionViewsTestCase):
 
         assert response.status_code == 200
 
+    def test_change_view_fetches_object_once(self):
+        obj = mommy.make('test_app.TestModel1')
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+        # The parameters are left out, django 1.8 records them apart
+        object_query = 'WHERE "test_app_testmodel1"."id" = '
+
+        for username, password in (
+                ('user_with_v_perm_on_model1', 'simple_user'),
+                ('super_user', 'super_user')):
+            self.client.login(username=username, password=password)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            assert response.status_code == 200
+            assert len([query for query in queries.captured_queries
+                        if object_query in query['sql']]) == 1
+
+    def _get_change_view_content(self, obj, skip_form):
+        model_admin = admin.site._registry[TestModel1]
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+        with patch.object(model_admin, 'view_only_skip_form', skip_form), \
+                patch('django.contrib.admin.options.modelform_factory',
+                      wraps=modelform_factory) as form_factory:
+            response = self.client.get(url)
+
+        assert response.status_code == 200
+        # The csrf token is masked differently on every response
+        return (re.sub(r'name=.csrfmiddlewaretoken. value=.[^\'"]*.', '',
+                       response.content.decode('utf-8')),
+                form_factory.call_count)
+
+    def test_change_view_from_simple_user_skips_the_form(self):
+        obj = mommy.make('test_app.TestModel1', var5='not editable',
+                         make_m2m=True)
+        mommy.make('test_app.TestModel2', var1=obj, _quantity=2)
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel2'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+
+        content, form_calls = self._get_change_view_content(obj, True)
+        form_content, form_form_calls = self._get_change_view_content(
+            obj, False)
+
+        assert form_calls == 0
+        assert form_form_calls == 1
+        assert content == form_content
+        assert 'View test model1' in content
+        assert obj.var1 in content
+        assert 'testmodel2_set-group' in content
+
+    def test_change_view_from_simple_user_with_form_media(self):
+        class ModelForm(forms.ModelForm):
+
+            class Media:
+                js = ('form.js', )
+
+        obj = mommy.make('test_app.TestModel1')
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'form', ModelForm):
+            content, form_calls = self._get_change_view_content(obj, True)
+
+        assert form_calls == 1
+        assert 'form.js' in content
+
+    def test_change_view_from_simple_user_renders_view_only_inlines(self):
+        obj = mommy.make('test_app.TestModel1')
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel2'),
+            Permission.objects.get(codename='view_testmodel3'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+
+        # The inline rows are rendered from a single queryset, without the
+        # formsets
+        query_counts = []
+        for rows in (10, 100, 1000):
+            mommy.make('test_app.TestModel2', var1=obj,
+                       _quantity=rows - TestModel2.objects.count())
+            mommy.make('test_app.TestModel3', var1=obj,
+                       _quantity=rows - TestModel3.objects.count())
+            with CaptureQueriesContext(connection) as queries, \
+                    patch('django.contrib.admin.options.'
+                          'inlineformset_factory',
+                          wraps=inlineformset_factory) as formset_factory:
+                response = self.client.get(url)
+
+            assert response.status_code == 200
+            assert formset_factory.call_count == 0
+            query_counts.append(len(queries))
+
+        content = response.content.decode('utf-8')
+        assert len(set(query_counts)) == 1
+        assert content.count('class="inline-related has_original') == 1000
+        assert content.count('<td class="field-var4">') == 1000
+        assert 'testmodel2_set-TOTAL_FORMS' not in content
+        assert 'testmodel3_set-TOTAL_FORMS' not in content
+
+    def test_change_view_from_simple_user_prefetches_relations(self):
+        class TestModel7Inline(admin.TabularInline):
+            model = TestModel7
+
+        obj = mommy.make('test_app.TestModel1', make_m2m=True)
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel7'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+
+        # The relations of the object and of the inline rows are fetched
+        # with a constant number of queries
+        query_counts = []
+        model_admin = admin.site._registry[TestModel1]
+        for rows in (5, 50):
+            mommy.make('test_app.TestModel7', var1=obj, make_m2m=True,
+                       _quantity=rows - TestModel7.objects.count())
+            with patch.object(model_admin, 'inlines', [TestModel7Inline]), \
+                    CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            assert response.status_code == 200
+            query_counts.append(len(queries))
+
+        assert query_counts[0] == query_counts[1]
+        assert response.content.decode('utf-8').count(
+            '<td class="field-var3">') == 50
+
+    @pytest.mark.skipif(VERSION[0:2] < (1, 9),
+                        reason='get_conditional_response is new in django 1.9')
+    def test_change_view_from_simple_user_conditional_get(self):
+        obj = mommy.make('test_app.TestModel1')
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+        model_admin = admin.site._registry[TestModel1]
+        versions = {obj.pk: datetime(2018, 1, 1, 12, 0)}
+
+        def get(**headers):
+            with patch.object(model_admin, 'view_only_etag_source',
+                              lambda obj: versions[obj.pk]), \
+                    patch.object(model_admin, '_create_formsets',
+                                 wraps=model_admin._create_formsets) as \
+                    create_formsets:
+                response = self.client.get(url, **headers)
+            return response, create_formsets.called
+
+        response, formsets_created = get()
+        assert response.status_code == 200
+        assert formsets_created
+        assert 'no-store' not in response['Cache-Control']
+        etag = response['ETag']
+        assert etag.startswith('"') and etag.endswith('"')
+        last_modified = response['Last-Modified']
+        assert last_modified == 'Mon, 01 Jan 2018 12:00:00 GMT'
+
+        response, formsets_created = get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert not formsets_created
+        assert response['ETag'] == etag
+
+        response, formsets_created = get(
+            HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+        # A new version of the object
+        versions[obj.pk] = datetime(2018, 1, 2)
+        response, formsets_created = get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+        # New permissions of the user
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel3'))
+        response, formsets_created = get(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'tests.tests.functional.test_views.DelegatingBackend',
+    ])
+    def test_change_view_conditional_get_custom_backend(self):
+        obj = mommy.make('test_app.TestModel1')
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_etag_source',
+                          lambda obj: datetime(2018, 1, 1)):
+            response = self.client.get(
+                reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                        args=(obj.pk,)),
+                HTTP_IF_MODIFIED_SINCE='Tue, 02 Jan 2018 00:00:00 GMT',
+            )
+
+        assert response.status_code == 200
+        assert not response.has_header('ETag')
+
+    def test_change_view_conditional_get_disallowed_to_field(self):
+        obj = mommy.make('test_app.TestModel1', var1='secret')
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        model_admin = admin.site._registry[TestModel1]
+        for object_id in ('secret', 'other'):
+            with patch.object(model_admin, 'view_only_etag_source',
+                              lambda obj: datetime(2018, 1, 1)):
+                response = self.client.get(
+                    reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                            args=(object_id,)),
+                    {'_to_field': 'var1'},
+                    HTTP_IF_MODIFIED_SINCE='Tue, 02 Jan 2018 00:00:00 GMT',
+                )
+
+            assert response.status_code == 400
+            assert not response.has_header('ETag')
+
+        assert obj.var1 == 'secret'
+
+    def test_change_view_conditional_get_without_etag_source(self):
+        obj = mommy.make('test_app.TestModel1')
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        response = self.client.get(
+            reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                    args=(obj.pk,)),
+        )
+
+        assert response.status_code == 200
+        assert not response.has_header('ETag')
+        assert 'no-store' in response['Cache-Control']
+
+    def test_change_view_from_simple_user_orders_view_only_inlines(self):
+        obj = mommy.make('test_app.TestModel1')
+        mommy.make('test_app.TestModel3', var1=obj, _quantity=2)
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel3'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                        args=(obj.pk,)),
+            )
+
+        assert response.status_code == 200
+        # django 1.8 records the queries as "QUERY = ... - PARAMS = ..."
+        inline_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'SELECT "test_app_testmodel3"."id"' in query['sql']
+        ]
+        assert inline_queries
+        assert all('ORDER BY "test_app_testmodel3"."id" ASC' in sql
+                   for sql in inline_queries)
+
+    def test_change_view_conditional_get_from_super_user(self):
+        obj = mommy.make('test_app.TestModel1')
+        self.client.login(username='super_user', password='super_user')
+        model_admin = admin.site._registry[TestModel1]
+        with patch.object(model_admin, 'view_only_etag_source', 'var3'):
+            response = self.client.get(
+                reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                        args=(obj.pk,)),
+            )
+
+        assert response.status_code == 200
+        assert not response.has_header('ETag')
+
+    def test_change_view_from_simple_user_paginates_inlines(self):
+        class TestModel3Inline(admin.TabularInline):
+            model = TestModel3
+            view_only_per_page = 2
+
+        obj = mommy.make('test_app.TestModel1')
+        pks = [
+            child.pk for child in
+            mommy.make('test_app.TestModel3', var1=obj, _quantity=5)
+        ]
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel3'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+        model_admin = admin.site._registry[TestModel1]
+
+        def get_page(params):
+            with patch.object(model_admin, 'inlines', [TestModel3Inline]):
+                response = self.client.get(url, params)
+
+            assert response.status_code == 200
+            bs = BeautifulSoup(response.content.decode('utf-8'),
+                               'html.parser')
+            links = dict(
+                (link.text, link['href'].split('#')[0])
+                for link in bs.select('#testmodel3_set-group .paginator a'))
+            return len(bs.select('#testmodel3_set-group tbody tr')), links
+
+        rows, links = get_page({})
+        assert rows == 2
+        assert links == {'Next': '?testmodel3_set-after=%s' % pks[1]}
+
+        rows, links = get_page({'testmodel3_set-after': pks[1]})
+        assert rows == 2
+        assert links == {
+            'Previous': '?testmodel3_set-before=%s' % pks[2],
+            'Next': '?testmodel3_set-after=%s' % pks[3],
+        }
+
+        rows, links = get_page({'testmodel3_set-after': pks[3]})
+        assert rows == 1
+        assert links == {'Previous': '?testmodel3_set-before=%s' % pks[4]}
+
+        rows, links = get_page({'testmodel3_set-before': pks[2]})
+        assert rows == 2
+        assert links == {'Next': '?testmodel3_set-after=%s' % pks[1]}
+
+        rows, links = get_page({'testmodel3_set-after': 'invalid'})
+        assert rows == 2
+
+    def test_change_view_from_user_with_change_perm_and_view_only_inline(
+            self):
+        obj = mommy.make('test_app.TestModel1', var1='a', var2='b', var3=1,
+                         var4=[mommy.make('test_app.TestModel0')])
+        mommy.make('test_app.TestModel2', var1=obj)
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='change_testmodel1'),
+            Permission.objects.get(codename='view_testmodel2'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        url = reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                      args=(obj.pk,))
+
+        response = self.client.get(url)
+
+        # The page saves the object, so the inline keeps its management form
+        assert response.status_code == 200
+        bs = BeautifulSoup(response.content.decode('utf-8'), 'html.parser')
+        form = bs.select('form#testmodel1_form')[0]
+        data = {}
+        for field in form.find_all(['input', 'textarea', 'select']):
+            name = field.get('name')
+            if not name or field.get('type') == 'submit':
+                continue
+            if field.name == 'textarea':
+                data[name] = field.text
+            elif field.name == 'select':
+                data[name] = [option['value'] for option in
+                              field.find_all('option', selected=True)]
+            else:
+                data[name] = field.get('value', '')
+        assert 'testmodel2_set-TOTAL_FORMS' in data
+
+        data['var1'] = 'c'
+        response = self.client.post(url, data)
+
+        assert response.status_code == 302
+        obj.refresh_from_db()
+        assert obj.var1 == 'c'
+
+    def test_view_only_inline_help_icon_exists(self):
+        assert finders.find(HELP_ICON)
+
+    def test_change_view_from_simple_user_with_editable_inline(self):
+        obj = mommy.make('test_app.TestModel1')
+        mommy.make('test_app.TestModel3', var1=obj)
+        self.user_with_v_perm_on_model1.user_permissions.add(
+            Permission.objects.get(codename='view_testmodel3'),
+            Permission.objects.get(codename='change_testmodel3'))
+        self.client.login(
+            username='user_with_v_perm_on_model1',
+            password='simple_user',
+        )
+        response = self.client.get(
+            reverse('admin:%s_%s_change' % ('test_app', 'testmodel1'),
+                    args=(obj.pk,)),
+        )
+
+        assert response.status_code == 200
+        assert 'testmodel3_set-TOTAL_FORMS' in response.content.decode('utf-8')
+
     def test_change_view_from_simple_user_translatable(self):
         """
         Smoke test: check if the change view renders for a django-parler model.
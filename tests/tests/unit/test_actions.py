@@ -0,0 +1,169 @@
+from __future__ import unicode_literals
+
+import json
+
+import pytest
+from django.contrib.admin import AdminSite
+from django.test import RequestFactory, TestCase
+from model_mommy import mommy
+
+from admin_view_permission.actions import export_as_csv, export_as_jsonl
+from admin_view_permission.enums import DjangoVersion
+from admin_view_permission.utils import DJANGO_VERSION
+from tests.test_app.admin import ModelAdmin1
+from tests.test_app.models import TestModel1, TestModel7
+from tests.tests.helpers import DataMixin, create_simple_user
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class ExportModelAdmin(ModelAdmin1):
+    actions = [export_as_csv, export_as_jsonl]
+
+
+class TestExportActions(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestExportActions, cls).setUpTestData()
+        cls.user_without_permissions = create_simple_user()
+
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+
+        cls.user_with_dv_perm_on_model1 = create_simple_user()
+        cls.user_with_dv_perm_on_model1.user_permissions.add(
+            cls.delete_permission_model1,
+            cls.view_permission_model1)
+
+    def setUp(self):
+        self.admin_site = AdminSite('test_admin')
+        self.admin_site.register(TestModel1, ExportModelAdmin)
+        self.modeladmin = self.admin_site._registry[TestModel1]
+
+    def get_request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+
+    def get_content(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_get_actions__view_permission(self):
+        actions = self.modeladmin.get_actions(
+            self.get_request(self.user_with_v_perm_on_model1))
+
+        assert list(actions) == ['export_as_csv', 'export_as_jsonl']
+
+    def test_get_actions__delete_view_permission(self):
+        actions = self.modeladmin.get_actions(
+            self.get_request(self.user_with_dv_perm_on_model1))
+
+        assert list(actions) == [
+            'delete_selected', 'export_as_csv', 'export_as_jsonl']
+
+    def test_get_actions__without_permissions(self):
+        actions = self.modeladmin.get_actions(
+            self.get_request(self.user_without_permissions))
+
+        assert list(actions) == []
+
+    def test_get_view_only_export_fields(self):
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        fields = self.modeladmin.get_view_only_export_fields(request)
+
+        assert [field.name for field in fields] == [
+            'id', 'var1', 'var2', 'var3']
+
+    def test_get_view_only_export_fields__relations(self):
+        self.admin_site.register(TestModel7, ExportModelAdmin)
+        modeladmin = self.admin_site._registry[TestModel7]
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        fields = modeladmin.get_view_only_export_fields(request)
+
+        assert [field.name for field in fields] == ['id', 'var1', 'var2']
+
+    def test_get_view_only_export_fields__fieldsets(self):
+        self.modeladmin.fieldsets = [(None, {'fields': ['var1']})]
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        fields = self.modeladmin.get_view_only_export_fields(request)
+
+        assert [field.name for field in fields] == ['id', 'var1']
+
+    def test_get_view_only_export_fields__get_readonly_fields(self):
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        with patch.object(self.modeladmin, 'get_readonly_fields',
+                          return_value=('var2', )):
+            fields = self.modeladmin.get_view_only_export_fields(request)
+
+        assert [field.name for field in fields] == ['id', 'var2']
+
+    def test_export_as_csv__fieldsets(self):
+        obj = mommy.make('test_app.TestModel1', var1='a', var2='b', var3=1)
+        self.modeladmin.fieldsets = [(None, {'fields': ['var1']})]
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        response = export_as_csv(
+            self.modeladmin, request, TestModel1.objects.all())
+
+        assert self.get_content(response).splitlines() == [
+            'id,var1',
+            '%s,a' % obj.pk,
+        ]
+
+    def test_export_as_csv(self):
+        obj1 = mommy.make('test_app.TestModel1', var1='a', var2='b,c',
+                          var3=1)
+        obj2 = mommy.make('test_app.TestModel1', var1='d', var2='e', var3=2)
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        response = export_as_csv(
+            self.modeladmin, request, TestModel1.objects.order_by('pk'))
+
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'] == \
+            'attachment; filename="testmodel1.csv"'
+        assert self.get_content(response).splitlines() == [
+            'id,var1,var2,var3',
+            '%s,a,"b,c",1' % obj1.pk,
+            '%s,d,e,2' % obj2.pk,
+        ]
+
+    def test_export_as_jsonl(self):
+        obj = mommy.make('test_app.TestModel1', var1='a', var2='b', var3=1)
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        response = export_as_jsonl(
+            self.modeladmin, request, TestModel1.objects.all())
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = self.get_content(response).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {'id': obj.pk, 'var1': 'a', 'var2': 'b', 'var3': 1},
+        ]
+
+    @pytest.mark.skipif(DJANGO_VERSION < DjangoVersion.DJANGO_20,
+                        reason='the chunk size is new in django 2.0')
+    def test_export__fetches_the_rows_in_chunks(self):
+        mommy.make('test_app.TestModel1', _quantity=3)
+        request = self.get_request(self.user_with_v_perm_on_model1)
+
+        with self.settings(ADMIN_VIEW_PERMISSION_EXPORT_CHUNK_SIZE=2), \
+                patch('django.db.models.query.QuerySet.iterator',
+                      autospec=True,
+                      side_effect=lambda queryset, **kwargs: iter(
+                          list(queryset))) as iterator:
+            response = export_as_jsonl(
+                self.modeladmin, request, TestModel1.objects.all())
+            lines = self.get_content(response).splitlines()
+
+        assert len(lines) == 3
+        assert iterator.call_args[1] == {'chunk_size': 2}
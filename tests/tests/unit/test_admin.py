@@ -4,6 +4,8 @@ from collections import OrderedDict, namedtuple
 
 import pytest
 from django import forms
+from django.conf.urls import url
+from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
 from django.contrib.admin import AdminSite
 from django.test import (
@@ -12,6 +14,7 @@ from django.test import (
     TestCase,
     override_settings,
 )
+from django.utils import translation
 from model_mommy import mommy
 from nose_parameterized import parameterized
 
@@ -20,8 +23,10 @@ from admin_view_permission.admin import (
     AdminViewPermissionInlineModelAdmin,
     AdminViewPermissionModelAdmin,
 )
+from admin_view_permission.cache import get_cache
+from admin_view_permission.permissions import PermissionIndex
 from tests.test_app.admin import ModelAdmin1
-from tests.test_app.models import TestModel1, TestModel5
+from tests.test_app.models import TestModel1, TestModel5, TestModel7
 from tests.tests.helpers import (
     DataMixin,
     create_simple_user,
@@ -30,10 +35,15 @@ from tests.tests.helpers import (
 )
 
 try:
-    from django.urls import reverse
+    from django.urls import NoReverseMatch, reverse
 except ImportError:
     # django < 2.0
-    from django.core.urlresolvers import reverse
+    from django.core.urlresolvers import NoReverseMatch, reverse
+
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
 
 
 class TestAdminViewPermissionBaseModelAdmin(DataMixin, TestCase):
@@ -800,6 +810,57 @@ class TestAdminViewPermissionBaseModelAdmin(DataMixin, TestCase):
 
         assert readonly_fields == result['get_fields']
 
+    def _view_request(self, user='user_with_v_perm_on_model1'):
+        request = self.factory.get('/')
+        request.user = getattr(self, user)
+        return request
+
+    def test_get_readonly_fields__layout_is_compiled_once(self):
+        modeladmin = self._modeladmin_simple()
+        obj = TestModel1(pk=1)
+
+        with patch.object(modeladmin, '_compile_readonly_fields',
+                          wraps=modeladmin._compile_readonly_fields) as func:
+            for _ in range(3):
+                readonly_fields = modeladmin.get_readonly_fields(
+                    self._view_request(), obj)
+
+        assert readonly_fields == ('var1', 'var2', 'var3', 'var4')
+        assert func.call_count == 1
+
+    def test_get_readonly_fields__layout_is_per_admin_instance(self):
+        modeladmin = self._modeladmin_simple()
+        obj = TestModel1(pk=1)
+        modeladmin.get_readonly_fields(self._view_request(), obj)
+
+        self.admin_site.unregister(TestModel1)
+        modeladmin = self._modeladmin_with_exclude_fields()
+        readonly_fields = modeladmin.get_readonly_fields(
+            self._view_request(), obj)
+
+        assert readonly_fields == ('var2', 'var3', 'var4')
+
+    def test_get_fields__view_only_without_fields_skips_the_form(self):
+        modeladmin = self._modeladmin_simple()
+        obj = TestModel1(pk=1)
+
+        with patch.object(modeladmin, 'get_form') as get_form:
+            fields = modeladmin.get_fields(self._view_request(), obj)
+
+        assert fields == ['var1', 'var2', 'var3', 'var4']
+        assert not get_form.called
+
+    def test_get_fields__layout_is_not_used_for_change(self):
+        modeladmin = self._modeladmin_simple()
+        obj = TestModel1(pk=1)
+        modeladmin.get_fields(self._view_request(), obj)
+        fields = modeladmin.get_fields(
+            self._view_request('user_with_cv_perm_on_model1'), obj)
+
+        assert fields == ['var1', 'var2', 'var3', 'var4']
+        assert modeladmin.get_readonly_fields(
+            self._view_request('user_with_cv_perm_on_model1'), obj) == ()
+
     @parameterized.expand(general_params)
     def test_has_view_permission(self, name, request_user, obj_func,
                                  obj_params, modeladmin_func, result):
@@ -1610,6 +1671,29 @@ class TestAdminViewPermissionModelAdmin(DataMixin, TestCase):
                         result['get_inline_instances']['inlines'][i][
                             'max_num'])
 
+    def test_get_inline_instances__class_is_reused(self):
+        modeladmin = self._modeladmin_simple()
+        obj = mommy.make('test_app.TestModel1')
+        url = reverse(
+            'test_admin:test_app_testmodel1_change',
+            args=(obj.pk,),
+            urlconf=create_urlconf(self.admin_site),
+        )
+
+        def get_inline_classes():
+            request = self.factory.get(url)
+            request.user = self.super_user
+            return [inline.__class__ for inline in
+                    modeladmin.get_inline_instances(request, obj)]
+
+        inline_classes = get_inline_classes()
+        class_count = len(AdminViewPermissionInlineModelAdmin.__subclasses__())
+        for _ in range(100):
+            assert get_inline_classes() == inline_classes
+
+        assert (len(AdminViewPermissionInlineModelAdmin.__subclasses__()) ==
+                class_count)
+
     @parameterized.expand(general_params)
     def test_get_model_perms(self, name, request_user, obj_func,
                              obj_params, modeladmin_func, result):
@@ -1703,6 +1787,53 @@ class TestAdminViewPermissionModelAdmin(DataMixin, TestCase):
         assert response.status_code == status_code
         assert cl_formset(response.context_data['cl'].formset)
 
+    @parameterized.expand([
+        ('user_with_v_perm_on_model1', 0),
+        ('user_with_av_perm_on_model1', 0),
+        ('user_with_cv_perm_on_model1', 1),
+        ('super_user', 1),
+    ])
+    def test_changelist_view__with_list_editable_formset_creation(
+            self, user, call_count):
+        modeladmin = self._modeladmin_with_list_editable()
+        mommy.make('test_app.TestModel1', _quantity=3)
+        url = reverse(
+            'test_admin:test_app_testmodel1_changelist',
+            urlconf=create_urlconf(self.admin_site)
+        )
+
+        request = self.factory.get(url)
+        request.user = getattr(self, user)
+        with patch.object(modeladmin, 'get_changelist_formset',
+                          wraps=modeladmin.get_changelist_formset) as formset:
+            response = modeladmin.changelist_view(request)
+
+        assert response.status_code == 200
+        assert formset.call_count == call_count
+
+    def test_changelist_view__with_list_editable_post_from_view_user(self):
+        modeladmin = self._modeladmin_with_list_editable()
+        obj = mommy.make('test_app.TestModel1', var2='original')
+        url = reverse(
+            'test_admin:test_app_testmodel1_changelist',
+            urlconf=create_urlconf(self.admin_site)
+        )
+
+        request = self.factory.post(url, {
+            'form-TOTAL_FORMS': '1',
+            'form-INITIAL_FORMS': '1',
+            'form-0-id': str(obj.pk),
+            'form-0-var2': 'changed',
+            '_save': 'Save',
+        })
+        request.user = self.user_with_v_perm_on_model1
+        request._dont_enforce_csrf_checks = True
+        response = modeladmin.changelist_view(request)
+        obj.refresh_from_db()
+
+        assert response.status_code == 200
+        assert obj.var2 == 'original'
+
 
 class TestAdminViewPermissionAdminSite(SimpleTestCase):
 
@@ -1748,3 +1879,423 @@ class TestAdminViewPermissionAdminSite(SimpleTestCase):
         self.admin_site.register(TestModel1)
         assert not isinstance(self.admin_site._registry[TestModel1],
                               AdminViewPermissionModelAdmin)
+
+
+class TestAdminViewPermissionAdminSiteAppDict(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestAdminViewPermissionAdminSiteAppDict, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+        cls.other_user_with_v_perm_on_model1 = create_simple_user()
+        cls.other_user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+        cls.user_with_cv_perm_on_model1 = create_simple_user()
+        cls.user_with_cv_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1,
+            cls.change_permission_model1)
+
+    def setUp(self):
+        get_cache().clear()
+        self.admin_site = AdminViewPermissionAdminSite('admin')
+        self.admin_site.register(TestModel1, ModelAdmin1)
+        self.modeladmin = self.admin_site._registry[TestModel1]
+        self.factory = RequestFactory()
+
+    def _build_app_dict(self, user, label=None):
+        request = self.factory.get('/')
+        request.user = getattr(self, user)
+        with patch.object(self.admin_site, '_get_app_dict',
+                          wraps=self.admin_site._get_app_dict) as get:
+            app_dict = self.admin_site._build_app_dict(request, label)
+
+        return app_dict, get.call_count
+
+    def test_build_app_dict__is_cached(self):
+        app_dict, call_count = self._build_app_dict(
+            'user_with_v_perm_on_model1')
+        cached_app_dict, cached_call_count = self._build_app_dict(
+            'user_with_v_perm_on_model1')
+
+        assert call_count == 1
+        assert cached_call_count == 0
+        assert cached_app_dict == app_dict
+        assert app_dict['test_app']['models'][0]['perms'] == {
+            'add': False, 'change': True, 'delete': False, 'view': True}
+
+    def test_build_app_dict__is_shared_between_same_permissions(self):
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict(
+            'other_user_with_v_perm_on_model1')
+
+        assert call_count == 0
+
+    def test_build_app_dict__is_not_shared_between_other_permissions(self):
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_cv_perm_on_model1')
+
+        assert call_count == 1
+
+    def test_build_app_dict__with_label(self):
+        app_dict, _ = self._build_app_dict(
+            'user_with_v_perm_on_model1', 'test_app')
+        cached_app_dict, call_count = self._build_app_dict(
+            'user_with_v_perm_on_model1', 'test_app')
+
+        assert call_count == 0
+        assert cached_app_dict == app_dict
+        assert app_dict['app_label'] == 'test_app'
+
+    def test_build_app_dict__invalidated_by_group_changes(self):
+        self._build_app_dict('user_with_v_perm_on_model1')
+        group = mommy.make('auth.Group')
+        group.permissions.add(self.add_permission_model1)
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    def test_build_app_dict__invalidated_by_register(self):
+        self._build_app_dict('user_with_v_perm_on_model1')
+        self.admin_site.register(TestModel5)
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    def test_build_app_dict__without_cache(self):
+        self.admin_site.cache_app_dict = False
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    @parameterized.expand([
+        ('has_module_permission', ),
+        ('get_model_perms', ),
+        ('has_view_permission', ),
+        ('has_add_permission', ),
+    ])
+    def test_build_app_dict__overridden_permission_method(self, name):
+        class ModelAdmin(admin.ModelAdmin):
+            pass
+
+        setattr(ModelAdmin, name, lambda self, *args: getattr(
+            admin.ModelAdmin, name, lambda *args: True)(self, *args))
+        self.admin_site.register(TestModel5, ModelAdmin)
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    @override_settings(ADMIN_VIEW_PERMISSION_MODELS=['test_app.TestModel1'])
+    def test_build_app_dict__model_admin_of_unlisted_model(self):
+        self.admin_site.register(TestModel5)
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 0
+
+    @override_settings(ADMIN_VIEW_PERMISSION_MODELS=['test_app.TestModel1'])
+    def test_build_app_dict__overridden_method_of_unlisted_model(self):
+        class ModelAdmin(admin.ModelAdmin):
+
+            def has_change_permission(self, request, obj=None):
+                return True
+
+        self.admin_site.register(TestModel5, ModelAdmin)
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'tests.tests.unit.test_permissions.PermissionBackend',
+    ])
+    def test_build_app_dict__custom_backend(self):
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 1
+
+    def test_build_app_dict__cached_after_unregister(self):
+        class ModelAdmin(admin.ModelAdmin):
+
+            def has_module_permission(self, request):
+                return True
+
+        self.admin_site.register(TestModel5, ModelAdmin)
+        self._build_app_dict('user_with_v_perm_on_model1')
+        self.admin_site.unregister(TestModel5)
+        self._build_app_dict('user_with_v_perm_on_model1')
+        _, call_count = self._build_app_dict('user_with_v_perm_on_model1')
+
+        assert call_count == 0
+
+    def test_build_app_dict__urls_are_reversed_once(self):
+        self.admin_site.cache_app_dict = False
+        with patch('admin_view_permission.admin.reverse',
+                   wraps=reverse) as reverse_mock:
+            app_dict, _ = self._build_app_dict('user_with_cv_perm_on_model1')
+            self._build_app_dict('user_with_cv_perm_on_model1')
+
+        assert reverse_mock.call_count == 2
+        assert app_dict['test_app']['app_url'] == '/admin/test_app/'
+        assert (app_dict['test_app']['models'][0]['admin_url'] ==
+                '/admin/test_app/testmodel1/')
+
+    def test_build_app_dict__urls_are_reversed_after_register(self):
+        self.admin_site.cache_app_dict = False
+        self._build_app_dict('user_with_cv_perm_on_model1')
+        self.admin_site.register(TestModel5)
+        with patch('admin_view_permission.admin.reverse',
+                   wraps=reverse) as reverse_mock:
+            self._build_app_dict('user_with_cv_perm_on_model1')
+
+        assert reverse_mock.call_count == 2
+
+    def test_reverse__depends_on_the_language(self):
+        urlconf = type(str('Urlconf'), (object, ), {
+            'urlpatterns': i18n_patterns(
+                url(r'^admin/', self.admin_site.urls)),
+        })
+        urls = []
+        with override_settings(ROOT_URLCONF=urlconf):
+            for language in ('en', 'de', 'en'):
+                with translation.override(language):
+                    urls.append(self.admin_site._reverse(
+                        'admin:app_list', app_label='test_app'))
+
+        assert urls == [
+            '/en/admin/test_app/',
+            '/de/admin/test_app/',
+            '/en/admin/test_app/',
+        ]
+
+    def test_reverse__no_reverse_match(self):
+        with patch('admin_view_permission.admin.reverse',
+                   wraps=reverse) as reverse_mock:
+            for _ in range(2):
+                with pytest.raises(NoReverseMatch):
+                    self.admin_site._reverse('admin:unknown')
+
+        assert reverse_mock.call_count == 1
+
+    def test_register__updates_the_app_registry(self):
+        self.admin_site._get_app_models('test_app')
+        self.admin_site.register(TestModel5)
+
+        assert self.admin_site._get_app_models('test_app') == {
+            TestModel1: self.modeladmin,
+            TestModel5: self.admin_site._registry[TestModel5],
+        }
+
+    def test_unregister__updates_the_app_registry(self):
+        self.admin_site._get_app_models('test_app')
+        self.admin_site.unregister(TestModel1)
+
+        assert self.admin_site._get_app_models('test_app') == {}
+
+    def test_build_app_dict__copied_registry(self):
+        self._build_app_dict('user_with_v_perm_on_model1', 'test_app')
+        other_site = AdminViewPermissionAdminSite('other_admin')
+        other_site.register(TestModel5)
+        self.admin_site._registry.update(other_site._registry)
+
+        app_dict, call_count = self._build_app_dict(
+            'user_with_v_perm_on_model1', 'test_app')
+
+        assert call_count == 1
+        assert [model['object_name'] for model in app_dict['models']] == [
+            'TestModel1']
+        assert TestModel5 in self.admin_site.get_permission_matrix(
+            self._get_request('user_with_v_perm_on_model1'), 'test_app')
+
+    def test_get_app_models__replaced_registry(self):
+        self.admin_site._get_app_models('test_app')
+        self.admin_site._registry = {}
+
+        assert self.admin_site._get_app_models('test_app') == {}
+
+    def test_get_app_models__replaced_model_admin(self):
+        self.admin_site._get_app_models('test_app')
+        model_admin = ModelAdmin1(TestModel1, self.admin_site)
+        self.admin_site._registry[TestModel1] = model_admin
+        self.admin_site._registry_changed()
+
+        assert self.admin_site._get_app_models('test_app') == {
+            TestModel1: model_admin}
+
+    def test_build_app_dict__copied_registry_of_other_app(self):
+        site = AdminViewPermissionAdminSite('other_admin')
+        site._registry.update(self.admin_site._registry)
+
+        app_dict = site._build_app_dict(
+            self._get_request('user_with_v_perm_on_model1'), 'test_app')
+
+        assert app_dict['app_label'] == 'test_app'
+
+    def test_build_app_dict__with_label_skips_other_apps(self):
+        self.admin_site.cache_app_dict = False
+        other_admins = []
+        for i in range(2000):
+            model, model_admin = Mock(), Mock()
+            model._meta.app_label = 'other_app'
+            self.admin_site._registry[model] = model_admin
+            other_admins.append(model_admin)
+
+        app_dict, call_count = self._build_app_dict(
+            'user_with_v_perm_on_model1', 'test_app')
+
+        assert call_count == 1
+        assert len(app_dict['models']) == 1
+        assert not any(model_admin.has_module_permission.called
+                       for model_admin in other_admins)
+
+    def _get_request(self, user):
+        request = self.factory.get('/')
+        request.user = getattr(self, user)
+        return request
+
+    @parameterized.expand([
+        ('user_with_v_perm_on_model1', ),
+        ('user_with_cv_perm_on_model1', ),
+    ])
+    def test_get_permission_matrix(self, user):
+        self.admin_site.register(TestModel5)
+        matrix = self.admin_site.get_permission_matrix(
+            self._get_request(user))
+
+        assert matrix == dict(
+            (model, model_admin.get_model_perms(self._get_request(user)))
+            for model, model_admin in self.admin_site._registry.items()
+        )
+
+    def test_get_permission_matrix__with_label(self):
+        matrix = self.admin_site.get_permission_matrix(
+            self._get_request('user_with_v_perm_on_model1'), 'test_app')
+
+        assert list(matrix) == [TestModel1]
+
+    def test_get_permission_matrix__overridden_permission_method(self):
+        class ModelAdmin(admin.ModelAdmin):
+
+            def has_add_permission(self, request):
+                return True
+
+        self.admin_site.register(TestModel5, ModelAdmin)
+        matrix = self.admin_site.get_permission_matrix(
+            self._get_request('user_with_v_perm_on_model1'))
+
+        assert matrix[TestModel5]['add'] is True
+        assert matrix[TestModel1]['add'] is False
+
+    @override_settings(ADMIN_VIEW_PERMISSION_MODELS=['test_app.TestModel1'])
+    def test_get_permission_matrix__model_admin_of_unlisted_model(self):
+        self.admin_site.register(TestModel5)
+        request = self._get_request('user_with_v_perm_on_model1')
+
+        assert not isinstance(self.admin_site._registry[TestModel5],
+                              AdminViewPermissionModelAdmin)
+        matrix = self.admin_site.get_permission_matrix(request)
+        app_dict = self.admin_site._build_app_dict(request)
+
+        assert matrix[TestModel5] == {
+            'add': False, 'change': False, 'delete': False}
+        assert [model['object_name']
+                for model in app_dict['test_app']['models']] == ['TestModel1']
+
+    def test_get_permission_matrix__large_registry(self):
+        # 1000 stand-in models, whose permissions are resolved from a single
+        # load of the user permissions. The user doesn't have the permissions
+        # in the database, so has_perm would deny them
+        models = []
+        for i in range(1000):
+            model = Mock()
+            model._meta.app_label = 'other_app'
+            model._meta.model_name = 'model%d' % i
+            model._meta.auto_created = False
+            self.admin_site._registry[model] = \
+                AdminViewPermissionModelAdmin(model, self.admin_site)
+            models.append(model)
+
+        request = self._get_request('user_with_v_perm_on_model1')
+        user = request.user
+        index = PermissionIndex(models + [TestModel1])
+        with patch('admin_view_permission.permissions._permission_index',
+                   index), \
+                patch.object(user, 'get_all_permissions', return_value={
+                    'test_app.view_testmodel1', 'other_app.add_model1',
+                }) as get_all_permissions:
+            matrix = self.admin_site.get_permission_matrix(request)
+
+        assert len(matrix) == 1001
+        assert get_all_permissions.call_count == 1
+        assert matrix[TestModel1] == {
+            'add': False, 'change': True, 'delete': False, 'view': True}
+        assert matrix[models[1]] == {
+            'add': True, 'change': False, 'delete': False, 'view': False}
+
+
+class TestAdminViewPermissionViewOnlyRelations(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestAdminViewPermissionViewOnlyRelations, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user_with_v_perm_on_model1
+
+    def test_get_view_only_relations(self):
+        modeladmin = AdminViewPermissionModelAdmin(TestModel7, AdminSite())
+        modeladmin.has_view_permission = Mock(return_value=True)
+
+        assert modeladmin.get_view_only_relations(self.request) == (
+            ('var1', 'var2'), ('var3', ))
+
+    def test_get_view_only_relations__without_relations(self):
+        modeladmin = ModelAdmin1(TestModel1, AdminSite())
+        modeladmin.readonly_fields = ('var6', )
+
+        assert modeladmin.get_view_only_relations(self.request) == (
+            (), ('var4', ))
+
+
+class TestAdminViewPermissionViewOnlyValidators(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestAdminViewPermissionViewOnlyValidators, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user_with_v_perm_on_model1
+        self.modeladmin = ModelAdmin1(TestModel1, AdminSite())
+
+    def test_get_view_only_validators__field(self):
+        self.modeladmin.view_only_etag_source = 'var3'
+        obj = mommy.make('test_app.TestModel1', var3=1)
+
+        etag, last_modified = self.modeladmin.get_view_only_validators(
+            self.request, obj)
+
+        assert etag and '"' not in etag
+        assert last_modified is None
+
+        obj.var3 = 2
+        assert self.modeladmin.get_view_only_validators(
+            self.request, obj)[0] != etag
+
+    def test_get_view_only_validators__without_version(self):
+        self.modeladmin.view_only_etag_source = lambda obj: None
+        obj = mommy.make('test_app.TestModel1')
+
+        assert self.modeladmin.get_view_only_validators(
+            self.request, obj) == (None, None)
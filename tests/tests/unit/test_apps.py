@@ -4,6 +4,14 @@ from django.apps import apps
 from django.db import models
 from django.db.models.signals import post_migrate
 from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+
+from admin_view_permission.apps import VIEW_PERMISSION_MARKER
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
 
 
 class TestAdminViewPermissionConfig(TestCase):
@@ -30,11 +38,11 @@ class TestAdminViewPermissionConfig(TestCase):
         self.model3 = type(str('AppTestModel3'), (models.Model, ),
                            attrs_2.copy())
 
-    def _trigger_signal(self):
+    def _trigger_signal(self, verbosity=1):
         post_migrate.send(
             sender=self.appconfig,
             app_config=self.appconfig,
-            verbosity=1,
+            verbosity=verbosity,
             interactive=True,
             using='default')
 
@@ -91,3 +99,36 @@ class TestAdminViewPermissionConfig(TestCase):
             self.model3._meta.permissions,
             ((u'copy_apptestmodel3', u'Can copy apptestmodel3'), )
         )
+
+    @override_settings(
+        ADMIN_VIEW_PERMISSION_MODELS=None
+    )
+    def test_ready__marks_the_models(self):
+        self._trigger_signal()
+        assert getattr(self.model1._meta, VIEW_PERMISSION_MARKER)
+        assert getattr(self.model2._meta, VIEW_PERMISSION_MARKER)
+
+    @override_settings(
+        ADMIN_VIEW_PERMISSION_MODELS=None
+    )
+    def test_ready__runs_once(self):
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            self._trigger_signal(verbosity=2)
+            self._trigger_signal(verbosity=2)
+
+        assert stdout.getvalue().count('Added the view permission') == 1
+        self.assertEqual(self.model1._meta.permissions,
+                         [('view_apptestmodel1', 'Can view apptestmodel1'), ])
+
+    @override_settings(
+        ADMIN_VIEW_PERMISSION_MODELS=['test_app.AppTestModel1', ]
+    )
+    def test_ready__does_not_mark_the_skipped_models(self):
+        self._trigger_signal()
+        assert not hasattr(self.model2._meta, VIEW_PERMISSION_MARKER)
+
+        with override_settings(ADMIN_VIEW_PERMISSION_MODELS=None):
+            self._trigger_signal()
+
+        self.assertEqual(self.model2._meta.permissions,
+                         [('view_apptestmodel2', 'Can view apptestmodel2'), ])
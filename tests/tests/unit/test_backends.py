@@ -0,0 +1,114 @@
+from __future__ import unicode_literals
+
+import warnings
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from admin_view_permission import backends
+from admin_view_permission.cache import invalidate_cache
+from tests.tests.helpers import create_simple_user
+
+User = get_user_model()
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+@override_settings(AUTHENTICATION_BACKENDS=[
+    'admin_view_permission.backends.CachedModelBackend',
+])
+class TestCachedModelBackend(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_simple_user()
+        cls.group = Group.objects.create(name='group')
+        cls.user.groups.add(cls.group)
+        cls.permission = Permission.objects.get(codename='view_testmodel1')
+
+    def setUp(self):
+        # The cache outlives the rolled back transaction of every test
+        invalidate_cache()
+
+    def get_user(self):
+        return User.objects.get(pk=self.user.pk)
+
+    def test_has_perm__no_queries_in_steady_state(self):
+        assert not self.get_user().has_perm('test_app.view_testmodel1')
+
+        user = self.get_user()
+        with CaptureQueriesContext(connection) as queries:
+            assert not user.has_perm('test_app.view_testmodel1')
+
+        assert len(queries) == 0
+
+    def test_user_permissions_changed(self):
+        assert not self.get_user().has_perm('test_app.view_testmodel1')
+
+        self.user.user_permissions.add(self.permission)
+
+        assert self.get_user().has_perm('test_app.view_testmodel1')
+
+    def test_group_permissions_changed(self):
+        assert not self.get_user().has_perm('test_app.view_testmodel1')
+
+        self.group.permissions.add(self.permission)
+
+        assert self.get_user().has_perm('test_app.view_testmodel1')
+
+    def test_groups_changed(self):
+        self.group.permissions.add(self.permission)
+        assert self.get_user().has_perm('test_app.view_testmodel1')
+
+        self.user.groups.remove(self.group)
+
+        assert not self.get_user().has_perm('test_app.view_testmodel1')
+
+    def test_superuser(self):
+        assert not self.get_user().has_perm('test_app.view_testmodel1')
+
+        User.objects.filter(pk=self.user.pk).update(is_superuser=True)
+
+        assert 'test_app.view_testmodel1' in \
+            self.get_user().get_all_permissions()
+
+    def test_inactive_user(self):
+        self.user.user_permissions.add(self.permission)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        assert self.get_user().get_all_permissions() == set()
+
+    def test_get_all_permissions__warns_on_local_memory_cache(self):
+        with patch.object(backends, '_local_cache_warned', False), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.get_user().has_perm('test_app.view_testmodel1')
+            self.get_user().has_perm('test_app.view_testmodel1')
+
+        assert [warning.category for warning in caught] == [RuntimeWarning]
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'shared': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            },
+        },
+        ADMIN_VIEW_PERMISSION_CACHE='shared',
+    )
+    def test_get_all_permissions__shared_cache_does_not_warn(self):
+        with patch.object(backends, '_local_cache_warned', False), \
+                warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.get_user().has_perm('test_app.view_testmodel1')
+
+        assert caught == []
@@ -0,0 +1,145 @@
+from __future__ import unicode_literals
+
+from django.contrib.admin import AdminSite
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from admin_view_permission.cache import (
+    PermissionCache,
+    get_cache,
+    get_cache_generation,
+    get_permission_cache,
+    invalidate_cache,
+)
+from admin_view_permission.enums import DjangoVersion
+from tests.test_app.admin import ModelAdmin1
+from tests.test_app.models import TestModel1
+from tests.tests.helpers import DataMixin, create_simple_user
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class TestPermissionCache(SimpleTestCase):
+
+    def test_get_or_set(self):
+        cache = PermissionCache(None)
+        calls = []
+
+        def func():
+            calls.append(1)
+            return True
+
+        assert cache.get_or_set('key', func) is True
+        assert cache.get_or_set('key', func) is True
+        assert len(calls) == 1
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_clear(self):
+        cache = PermissionCache(None)
+        cache.get_or_set('key', lambda: True)
+        cache.get_or_set('key', lambda: True)
+        cache.clear()
+
+        assert cache.decisions == {}
+        assert cache.hits == 0
+        assert cache.misses == 0
+
+    def test_get_permission_cache__same_request(self):
+        request = RequestFactory().get('/')
+        request.user = object()
+
+        assert get_permission_cache(request) is get_permission_cache(request)
+
+    def test_get_permission_cache__user_changed(self):
+        request = RequestFactory().get('/')
+        request.user = object()
+        cache = get_permission_cache(request)
+        request.user = object()
+
+        assert get_permission_cache(request) is not cache
+
+
+class TestModelAdminPermissionCache(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestModelAdminPermissionCache, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+
+    def setUp(self):
+        self.modeladmin = ModelAdmin1(TestModel1, AdminSite())
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user_with_v_perm_on_model1
+
+    def test_has_view_permission(self):
+        with patch.object(self.request.user, 'has_perm',
+                          return_value=True) as has_perm:
+            assert self.modeladmin.has_view_permission(self.request)
+            assert self.modeladmin.has_view_permission(self.request)
+
+        assert has_perm.call_count == 1
+
+    def test_has_change_permission(self):
+        assert self.modeladmin.has_change_permission(self.request)
+        assert not self.modeladmin._has_change_only_permission(self.request)
+
+        cache = get_permission_cache(self.request)
+        assert cache.misses == 2
+        assert cache.hits == 1
+
+    def test_objects_are_cached_separately(self):
+        obj = TestModel1(pk=1)
+        self.modeladmin.has_add_permission(self.request)
+        self.modeladmin.has_delete_permission(self.request)
+        self.modeladmin.has_delete_permission(self.request, obj)
+
+        cache = get_permission_cache(self.request)
+        assert cache.misses == 3
+        assert cache.hits == 0
+
+    def test_get_fields(self):
+        obj = TestModel1(pk=1)
+        self.modeladmin.get_fields(self.request, obj)
+
+        cache = get_permission_cache(self.request)
+        assert cache.hits > 0
+
+
+class TestInvalidateCache(SimpleTestCase):
+
+    def setUp(self):
+        get_cache().clear()
+
+    @patch('admin_view_permission.cache.DJANGO_VERSION',
+           DjangoVersion.DJANGO_19)
+    def test_invalidate_cache__on_commit(self):
+        generation = get_cache_generation()
+
+        with patch('django.db.transaction.on_commit', create=True) as \
+                on_commit:
+            invalidate_cache(using='other')
+
+        assert get_cache_generation() == generation + 1
+        callback = on_commit.call_args[0][0]
+        assert on_commit.call_args[1] == {'using': 'other'}
+
+        # The entries cached before the commit are invalidated too
+        callback()
+        assert get_cache_generation() == generation + 2
+
+    @patch('admin_view_permission.cache.DJANGO_VERSION',
+           DjangoVersion.DJANGO_18)
+    def test_invalidate_cache__with_django_18(self):
+        generation = get_cache_generation()
+
+        with patch('django.db.transaction.on_commit', create=True) as \
+                on_commit:
+            invalidate_cache()
+
+        assert get_cache_generation() == generation + 1
+        assert not on_commit.called
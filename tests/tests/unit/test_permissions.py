@@ -0,0 +1,155 @@
+from __future__ import unicode_literals
+
+from django.contrib import admin
+from django.contrib.admin import AdminSite
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import override_settings
+
+from admin_view_permission.admin import AdminViewPermissionModelAdmin
+from admin_view_permission.permissions import (
+    PermissionIndex,
+    get_permission_index,
+    has_indexed_permission,
+)
+from tests.test_app.admin import ModelAdmin1
+from tests.test_app.models import TestModel1, TestModel2
+from tests.tests.helpers import (
+    DataMixin,
+    create_simple_user,
+    create_super_user,
+)
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class PermissionBackend(ModelBackend):
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return True
+
+
+class TestPermissionIndex(SimpleTestCase):
+
+    def test_masks(self):
+        index = PermissionIndex([TestModel1, TestModel2])
+        masks = [
+            index.get_mask(model, action)
+            for model in (TestModel1, TestModel2)
+            for action in ('add', 'change', 'delete', 'view')
+        ]
+
+        assert len(set(masks)) == 8
+        assert index.get_mask(AnonymousUser, 'view') is None
+
+    def test_get_bitset(self):
+        index = PermissionIndex([TestModel1, TestModel2])
+        bitset = index.get_bitset({
+            'test_app.view_testmodel1',
+            'test_app.add_testmodel2',
+            'unknown.view_unknown',
+        })
+
+        assert bitset & index.get_mask(TestModel1, 'view')
+        assert bitset & index.get_mask(TestModel2, 'add')
+        assert not bitset & index.get_mask(TestModel1, 'add')
+        assert not bitset & index.get_mask(TestModel2, 'view')
+
+
+class TestHasIndexedPermission(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestHasIndexedPermission, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user_with_v_perm_on_model1
+
+    def test_has_indexed_permission(self):
+        assert has_indexed_permission(self.request, TestModel1, 'view')
+        assert not has_indexed_permission(self.request, TestModel1, 'add')
+        assert not has_indexed_permission(self.request, TestModel2, 'view')
+
+    def test_has_indexed_permission__superuser(self):
+        self.request.user = create_super_user()
+
+        assert has_indexed_permission(self.request, TestModel1, 'add')
+
+    def test_has_indexed_permission__anonymous_user(self):
+        self.request.user = AnonymousUser()
+
+        assert not has_indexed_permission(self.request, TestModel1, 'view')
+
+    def test_has_indexed_permission__not_indexed_model(self):
+        assert has_indexed_permission(
+            self.request, AnonymousUser, 'view') is None
+
+    @override_settings(AUTHENTICATION_BACKENDS=[
+        'tests.tests.unit.test_permissions.PermissionBackend',
+    ])
+    def test_has_indexed_permission__custom_backend(self):
+        assert has_indexed_permission(
+            self.request, TestModel1, 'view') is None
+
+    def test_has_indexed_permission__custom_has_perm(self):
+        with patch.object(self.request.user, 'has_perm', return_value=True):
+            assert has_indexed_permission(
+                self.request, TestModel1, 'view') is None
+
+    def test_permissions_are_loaded_once(self):
+        with patch.object(self.request.user, 'get_all_permissions',
+                          return_value=set()) as get_all_permissions:
+            has_indexed_permission(self.request, TestModel1, 'view')
+            has_indexed_permission(self.request, TestModel1, 'add')
+
+        assert get_all_permissions.call_count == 1
+
+
+class TestModelAdminIndexedPermissions(DataMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TestModelAdminIndexedPermissions, cls).setUpTestData()
+        cls.user_with_v_perm_on_model1 = create_simple_user()
+        cls.user_with_v_perm_on_model1.user_permissions.add(
+            cls.view_permission_model1, cls.add_permission_model1)
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user_with_v_perm_on_model1
+
+    def test_permissions(self):
+        modeladmin = ModelAdmin1(TestModel1, AdminSite())
+        user = self.request.user
+
+        assert get_permission_index().get_mask(TestModel1, 'view')
+        assert modeladmin.get_model_perms(self.request) == {
+            'add': user.has_perm('test_app.add_testmodel1'),
+            'change': True,
+            'delete': user.has_perm('test_app.delete_testmodel1'),
+            'view': user.has_perm('test_app.view_testmodel1'),
+        }
+
+    def test_overridden_permission_method(self):
+        class PermissionMixin(admin.ModelAdmin):
+
+            def has_delete_permission(self, request, obj=None):
+                return True
+
+        # The permission method of the mixin follows the method of the
+        # package in the MRO, so it can't be replaced by the index
+        class ModelAdmin(AdminViewPermissionModelAdmin, PermissionMixin):
+            pass
+
+        modeladmin = ModelAdmin(TestModel1, AdminSite())
+
+        assert modeladmin.has_delete_permission(self.request)
+        assert modeladmin.has_add_permission(self.request)
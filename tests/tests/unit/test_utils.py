@@ -1,14 +1,21 @@
 from __future__ import unicode_literals
 
+import pytest
+from django import VERSION
 from django.test import SimpleTestCase
 
 from admin_view_permission.enums import DjangoVersion
-from admin_view_permission.utils import django_version
+from admin_view_permission.utils import (
+    django_version,
+    get_model_name,
+    is_anonymous,
+)
+from tests.test_app.models import TestModel1
 
 try:
-    from unittest.mock import patch
+    from unittest.mock import Mock, patch
 except ImportError:
-    from mock import patch
+    from mock import Mock, patch
 
 
 class TestUtils(SimpleTestCase):
@@ -33,10 +40,35 @@ class TestUtils(SimpleTestCase):
     def test_django_version__with_django_20(self):
         assert django_version() == DjangoVersion.DJANGO_20
 
-    # @patch('django.get_version', lambda: '1.8')
-    # def test_get_model_name_with_django_18(self):
-    #     assert get_model_name(TestModel1) == 'test_app.TestModel1'
-    #
-    # @patch('django.get_version', lambda: '1.9')
-    # def test_get_model_name_with_django_bigger_than_18(self):
-    #     assert get_model_name(TestModel1) == 'test_app.TestModel1'
+    @patch('admin_view_permission.utils.DJANGO_VERSION',
+           DjangoVersion.DJANGO_18)
+    def test_get_model_name__with_django_18(self):
+        assert get_model_name(TestModel1) == 'test_app.TestModel1'
+
+    @pytest.mark.skipif(VERSION[0:2] < (1, 9),
+                        reason='the model label is new in django 1.9')
+    @patch('admin_view_permission.utils.DJANGO_VERSION',
+           DjangoVersion.DJANGO_19)
+    def test_get_model_name__with_django_bigger_than_18(self):
+        assert get_model_name(TestModel1) == 'test_app.TestModel1'
+
+    def test_get_model_name__does_not_detect_the_version(self):
+        with patch('django.get_version') as get_version:
+            for _ in range(1000):
+                get_model_name(TestModel1)
+
+        assert not get_version.called
+
+    @patch('admin_view_permission.utils.DJANGO_VERSION',
+           DjangoVersion.DJANGO_19)
+    def test_is_anonymous__with_django_19(self):
+        # is_anonymous is a method before django 1.10
+        user = Mock(**{'is_anonymous.return_value': False})
+
+        assert is_anonymous(user) is False
+
+    @patch('admin_view_permission.utils.DJANGO_VERSION',
+           DjangoVersion.DJANGO_110)
+    def test_is_anonymous(self):
+        assert is_anonymous(Mock(is_anonymous=True)) is True
+        assert is_anonymous(Mock(is_anonymous=False)) is False